@@ -0,0 +1,285 @@
+"""
+Streaming Arrhenius fits for kinetics logs larger than memory.
+
+ln(k) = ln(A) - Ea / (R T) is a straight line in x = 1/T, so the least
+squares fit of each reaction only needs the sums n, Σx, Σy, Σxy, Σx² (and
+Σy² for the confidence intervals). Those sums are computed per reaction ID
+for each block of the input and added together, so memory depends on the
+number of reactions, not the number of rows, and blocks can be reduced in
+parallel in any order.
+
+x is measured from 1/T_REF rather than from 0; this is the same line, but
+keeps Σx² - (Σx)²/n from cancelling to nothing for narrow temperature
+ranges.
+
+Usage:
+    python arrhenius.py kinetics.csv --group reaction --temperature T --rate k
+    python arrhenius.py kinetics.parquet --workers 4 --output fits.csv
+"""
+
+import argparse
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import constants, stats
+
+T_REF = 298.15
+X_REF = 1 / T_REF
+BLOCK_SIZE = 64 * 1024 * 1024
+SUMS = ["n", "sum_x", "sum_y", "sum_xy", "sum_xx", "sum_yy"]
+
+
+def group_statistics(reaction_ids, T, k):
+    """
+    Computes the per-reaction sufficient statistics of ln(k) against 1/T.
+
+    Rows with a non-positive or missing T or k are skipped. Reaction IDs
+    are compared as strings, so 1 and "1" are the same reaction whichever
+    block or file they came from.
+
+    Parameters:
+    reaction_ids (array-like): The reaction ID of each row.
+    T (array-like): The temperatures in K.
+    k (array-like): The rate constants.
+
+    Returns:
+    pandas.DataFrame: Indexed by reaction ID, with the columns in SUMS.
+    """
+    T = np.asarray(T, dtype=float)
+    k = np.asarray(k, dtype=float)
+    valid = (T > 0) & (k > 0)
+    x = 1 / T[valid] - X_REF
+    y = np.log(k[valid])
+    frame = pd.DataFrame(
+        {
+            "n": np.ones_like(x),
+            "sum_x": x,
+            "sum_y": y,
+            "sum_xy": x * y,
+            "sum_xx": x * x,
+            "sum_yy": y * y,
+        }
+    )
+    ids = pd.Series(np.asarray(reaction_ids, dtype=object)[valid])
+    ids = ids.where(ids.isna(), ids.astype(str))
+    return frame.groupby(ids.to_numpy(), sort=False).sum()
+
+
+def merge_statistics(total, part):
+    """
+    Adds two tables of statistics from group_statistics.
+    """
+    if total is None:
+        return part
+    return total.add(part, fill_value=0)
+
+
+def fit_from_statistics(statistics, confidence=0.95):
+    """
+    Fits Ea and A for every reaction from its summed statistics.
+
+    Parameters:
+    statistics (pandas.DataFrame): As returned by group_statistics.
+    confidence (float): The confidence level of the intervals.
+
+    Returns:
+    pandas.DataFrame: Per reaction: n, Ea (J/mol) with Ea_low/Ea_high, A
+    (same units as k) with A_low/A_high, and r_squared. Reactions with
+    fewer than three points get NaN intervals.
+    """
+    s = statistics
+    n = s["n"].to_numpy()
+    mean_x = s["sum_x"].to_numpy() / n
+    mean_y = s["sum_y"].to_numpy() / n
+    sxx = s["sum_xx"].to_numpy() - n * mean_x**2
+    syy = s["sum_yy"].to_numpy() - n * mean_y**2
+    sxy = s["sum_xy"].to_numpy() - n * mean_x * mean_y
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = sxy / sxx
+        # Intercept at 1/T = 0, i.e. x = -X_REF.
+        ln_A = mean_y + slope * (-X_REF - mean_x)
+        residual = np.maximum(syy - slope * sxy, 0.0)
+        dof = n - 2
+        s2 = np.where(dof > 0, residual / dof, np.nan)
+        se_slope = np.sqrt(s2 / sxx)
+        se_ln_A = np.sqrt(s2 * (1 / n + (-X_REF - mean_x) ** 2 / sxx))
+        t = stats.t.ppf(0.5 + confidence / 2, np.where(dof > 0, dof, np.nan))
+        r_squared = sxy**2 / (sxx * syy)
+
+    Ea = -slope * constants.R
+    return pd.DataFrame(
+        {
+            "n": n.astype(np.int64),
+            "Ea": Ea,
+            "Ea_low": Ea - t * se_slope * constants.R,
+            "Ea_high": Ea + t * se_slope * constants.R,
+            "A": np.exp(ln_A),
+            "A_low": np.exp(ln_A - t * se_ln_A),
+            "A_high": np.exp(ln_A + t * se_ln_A),
+            "r_squared": r_squared,
+        },
+        index=s.index,
+    )
+
+
+def fit_arrhenius_frame(df, group="reaction", temperature="T", rate="k"):
+    """
+    Fits an in-memory DataFrame; the same result as np.polyfit per group.
+    """
+    statistics = group_statistics(df[group], df[temperature], df[rate])
+    return fit_from_statistics(statistics)
+
+
+def csv_blocks(path, block_size=BLOCK_SIZE):
+    """
+    Splits a CSV file into byte ranges that start and end on line breaks.
+
+    Returns:
+    list of str: The header columns.
+    list of tuple: (start, end) byte offsets of the data blocks.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as file_object:
+        header = file_object.readline()
+        start = file_object.tell()
+        blocks = []
+        while start < size:
+            file_object.seek(min(start + block_size, size))
+            file_object.readline()
+            end = min(file_object.tell(), size)
+            blocks.append((start, end))
+            start = end
+    columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+    return columns, blocks
+
+
+def _csv_block_statistics(path, start, end, names, group, temperature, rate):
+    # Runs in a worker: parse one byte range of the CSV and reduce it.
+    with open(path, "rb") as file_object:
+        file_object.seek(start)
+        data = file_object.read(end - start)
+    chunk = pd.read_csv(
+        io.BytesIO(data),
+        header=None,
+        names=names,
+        usecols=[group, temperature, rate],
+        # Otherwise each block guesses the type of the IDs on its own.
+        dtype={group: str},
+    )
+    return group_statistics(chunk[group], chunk[temperature], chunk[rate])
+
+
+def _parquet_statistics(path, row_group, group, temperature, rate):
+    # Runs in a worker: read one Parquet row group and reduce it.
+    import pyarrow.parquet as pq
+
+    table = pq.ParquetFile(path).read_row_group(
+        row_group, columns=[group, temperature, rate]
+    )
+    chunk = table.to_pandas()
+    return group_statistics(chunk[group], chunk[temperature], chunk[rate])
+
+
+def _tasks(path, group, temperature, rate, block_size):
+    if path.lower().endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files needs pyarrow installed.")
+        for row_group in range(pq.ParquetFile(path).num_row_groups):
+            yield _parquet_statistics, (path, row_group, group, temperature, rate)
+    else:
+        names, blocks = csv_blocks(path, block_size)
+        for start, end in blocks:
+            yield _csv_block_statistics, (
+                path,
+                start,
+                end,
+                names,
+                group,
+                temperature,
+                rate,
+            )
+
+
+def fit_arrhenius(
+    path,
+    group="reaction",
+    temperature="T",
+    rate="k",
+    workers=None,
+    block_size=BLOCK_SIZE,
+    confidence=0.95,
+):
+    """
+    Fits Ea and A per reaction from a CSV or Parquet file of any size.
+
+    CSV files are cut into byte blocks and Parquet files into row groups;
+    each is reduced to per-reaction sums in a worker process, with at most
+    two blocks per worker in flight, and the sums are added as they arrive.
+
+    Parameters:
+    path (str): A .csv or .parquet file.
+    group (str): The column with the reaction IDs.
+    temperature (str): The column with the temperatures in K.
+    rate (str): The column with the rate constants.
+    workers (int): Number of worker processes (default: CPU count); 1
+    reduces the blocks in this process.
+    block_size (int): Bytes of CSV per block.
+    confidence (float): The confidence level of the intervals.
+
+    Returns:
+    pandas.DataFrame: As returned by fit_from_statistics.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = _tasks(path, group, temperature, rate, block_size)
+    total = None
+
+    if workers == 1:
+        for function, args in tasks:
+            total = merge_statistics(total, function(*args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for function, args in tasks:
+                pending.append(executor.submit(function, *args))
+                if len(pending) >= workers * 2:
+                    total = merge_statistics(total, pending.popleft().result())
+            while pending:
+                total = merge_statistics(total, pending.popleft().result())
+
+    if total is None:
+        total = pd.DataFrame(columns=SUMS, dtype=float)
+    return fit_from_statistics(total, confidence)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming Arrhenius fits.")
+    parser.add_argument("path", help="CSV or Parquet file.")
+    parser.add_argument("--group", default="reaction")
+    parser.add_argument("--temperature", default="T")
+    parser.add_argument("--rate", default="k")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--output", default=None, help="CSV file for the fits.")
+    args = parser.parse_args()
+
+    fits = fit_arrhenius(
+        args.path,
+        args.group,
+        args.temperature,
+        args.rate,
+        args.workers,
+        args.block_size,
+        args.confidence,
+    )
+    if args.output:
+        fits.to_csv(args.output)
+    else:
+        print(fits.to_string())
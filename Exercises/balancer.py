@@ -0,0 +1,192 @@
+from fractions import Fraction
+from functools import lru_cache, reduce
+from math import gcd
+
+from formula_parser import formula_to_composition
+
+CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _composition(formula):
+    return formula_to_composition(formula)
+
+
+def _lcm(a, b):
+    return a * b // gcd(a, b)
+
+
+def composition_matrix(species):
+    """
+    Build the integer element x species composition matrix.
+
+    Parameters:
+    species (list of str): The formulas, one per column.
+
+    Returns:
+    list: The sorted composition keys (atomic numbers, 0 = charge).
+    list of list of int: One row per key, one column per species. Rows with
+    non-integer subscripts (e.g. 'UO2.3') are scaled to integers.
+    """
+    compositions = [_composition(formula) for formula in species]
+    keys = sorted(set().union(*compositions))
+    matrix = []
+    for key in keys:
+        row = [Fraction(str(comp.get(key, 0))) for comp in compositions]
+        scale = reduce(_lcm, (value.denominator for value in row), 1)
+        matrix.append([int(value * scale) for value in row])
+    return keys, matrix
+
+
+def integer_nullspace(matrix, n_columns):
+    """
+    Find the integer nullspace of an integer matrix.
+
+    Uses fraction-free Gauss-Jordan elimination: every row operation is
+    an integer cross-multiplication followed by division by the row gcd,
+    so the arithmetic stays exact and the entries stay small.
+
+    Parameters:
+    matrix (list of list of int): The matrix to reduce (not modified).
+    n_columns (int): The number of columns.
+
+    Returns:
+    list of list of int: One primitive integer basis vector per free column.
+    """
+    rows = [list(row) for row in matrix if any(row)]
+    pivots = []
+    rank = 0
+    for col in range(n_columns):
+        pivot = next((r for r in range(rank, len(rows)) if rows[r][col]), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        p_row = rows[rank]
+        p = p_row[col]
+        for r, row in enumerate(rows):
+            if r == rank or not row[col]:
+                continue
+            factor = row[col]
+            row = [p * a - factor * b for a, b in zip(row, p_row)]
+            divisor = reduce(gcd, row)
+            rows[r] = [a // divisor for a in row] if divisor > 1 else row
+        pivots.append(col)
+        rank += 1
+        if rank == len(rows):
+            break
+
+    basis = []
+    for free in (c for c in range(n_columns) if c not in pivots):
+        # Each pivot row reads p * x[pivot] + a * x[free] = 0.
+        scale = reduce(_lcm, (abs(rows[r][c]) for r, c in enumerate(pivots)), 1)
+        vector = [0] * n_columns
+        vector[free] = scale
+        for r, c in enumerate(pivots):
+            vector[c] = -rows[r][free] * scale // rows[r][c]
+        divisor = reduce(gcd, vector)
+        basis.append([v // divisor for v in vector])
+    return basis
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _balance(reactants, products):
+    species = reactants + products
+    keys, matrix = composition_matrix(species)
+    n_reactants = len(reactants)
+
+    # Check that every component is present on both sides (a side may lack
+    # it only if the other side has both positive and negative parts).
+    for key, row in zip(keys, matrix):
+        sides = (
+            ("reactants", row[:n_reactants], row[n_reactants:]),
+            ("products", row[n_reactants:], row[:n_reactants]),
+        )
+        for name, side, other in sides:
+            if any(side):
+                continue
+            if not (any(v > 0 for v in other) and any(v < 0 for v in other)):
+                raise ValueError("Component '%s' not among %s" % (key, name))
+
+    signed = [[-v for v in row[:n_reactants]] + row[n_reactants:] for row in matrix]
+    basis = integer_nullspace(signed, len(species))
+    if len(basis) == 0:
+        raise ValueError("Failed to balance reaction")
+    if len(basis) > 1:
+        # More than one independent balancing: left to chempy, which
+        # returns the parametric solution.
+        return None
+
+    (coefficients,) = basis
+    if 0 in coefficients:
+        raise ValueError("Superfluous species given.")
+    if sum(coefficients) < 0:
+        coefficients = [-c for c in coefficients]
+    return tuple(coefficients)
+
+
+def balance_stoichiometry(reactants, products):
+    """
+    Balances the stoichiometric coefficients of a reaction.
+
+    Drop-in replacement for chempy.balance_stoichiometry. The composition
+    matrix is solved with exact integer elimination instead of sympy, and
+    results are cached by the sorted reactant and product formulas, so the
+    same reaction written in another order is only solved once. Reactions
+    with more than one independent balancing are passed on to chempy, which
+    returns coefficients in terms of sympy symbols (x1, x2, ...).
+
+    Parameters:
+    reactants (iterable of str): Reactant formulas, e.g. {"H2", "O2"}.
+    products (iterable of str): Product formulas, e.g. {"H2O"}.
+
+    Returns:
+    dict: Reactant formula -> coefficient.
+    dict: Product formula -> coefficient.
+    """
+    if type(reactants) == set:  # noqa
+        reactants = sorted(reactants)
+    if type(products) == set:  # noqa
+        products = sorted(products)
+    reactants, products = list(reactants), list(products)
+
+    duplicates = sorted(set(reactants) & set(products))
+    if duplicates:
+        raise ValueError("Substances on both sides: %s" % str(duplicates))
+
+    # Canonical cache key: the species of each side, in sorted order.
+    reactant_key, product_key = tuple(sorted(reactants)), tuple(sorted(products))
+    solution = _balance(reactant_key, product_key)
+    if solution is None:
+        from chempy import balance_stoichiometry as chempy_balance
+
+        reactants, products = chempy_balance(reactants, products)
+        return dict(reactants), dict(products)
+    coefficients = dict(zip(reactant_key + product_key, solution))
+    return (
+        {k: coefficients[k] for k in reactants},
+        {k: coefficients[k] for k in products},
+    )
+
+
+def cache_info():
+    """
+    Return the hit/miss statistics of the balanced-reaction cache.
+    """
+    return _balance.cache_info()
+
+
+def clear_cache():
+    """
+    Empty the balanced-reaction and composition caches.
+    """
+    _balance.cache_clear()
+    _composition.cache_clear()
+
+
+if __name__ == "__main__":
+    print(balance_stoichiometry({"H2", "O2"}, {"H2O"}))
+    print(
+        balance_stoichiometry(
+            ["KMnO4", "FeSO4", "H2SO4"], ["K2SO4", "MnSO4", "Fe2(SO4)3", "H2O"]
+        )
+    )
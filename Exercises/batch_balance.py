@@ -0,0 +1,155 @@
+"""
+Batch mode for balancing chemical equations from a file.
+
+Usage:
+    python batch_balance.py balance reactions.txt balanced.csv
+    python batch_balance.py balance reactions.csv balanced.csv --column reaction
+
+Reactions are read one per line (or one per CSV row), balanced across a
+process pool in chunks, and written to the output CSV in input order. A
+line that cannot be balanced gets an error message in the "error" column
+instead of stopping the run.
+"""
+
+import argparse
+import csv
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from balancer import balance_stoichiometry
+from console_testv5 import format_chemical_equation, parse_chemical_equation
+
+CHUNKSIZE = 2000
+
+
+def balance_line(reaction_string):
+    """
+    Balances one reaction string.
+
+    Parameters:
+    reaction_string (str): A chemical equation, e.g., "H2 + O2 -> H2O".
+
+    Returns:
+    str: The balanced equation, or "" if balancing failed.
+    str: The error message, or "" if balancing succeeded.
+    """
+    try:
+        reactants, products = parse_chemical_equation(reaction_string)
+        reactants, products = balance_stoichiometry(reactants, products)
+        return format_chemical_equation(reactants, products), ""
+    except Exception as e:
+        return "", f"{type(e).__name__}: {e}"
+
+
+def balance_chunk(reactions):
+    """
+    Balances a list of reactions in a worker process.
+    """
+    return [balance_line(reaction) for reaction in reactions]
+
+
+def read_reactions(path, column=None):
+    """
+    Yields reaction strings from a text file (one per line) or a CSV file.
+
+    Parameters:
+    path (str): The input file. Files ending in .csv are read as CSV.
+    column (str): The CSV column holding the reactions; defaults to the
+    first column. Ignored for text files.
+    """
+    with open(path, newline="") as file_object:
+        if path.lower().endswith(".csv"):
+            reader = csv.reader(file_object)
+            header = next(reader, [])
+            index = header.index(column) if column else 0
+            for row in reader:
+                yield row[index] if index < len(row) else ""
+        else:
+            for line in file_object:
+                yield line.rstrip("\r\n")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def balance_file(
+    input_path, output_path, workers=None, chunksize=CHUNKSIZE, column=None
+):
+    """
+    Balances every reaction in a file using a process pool.
+
+    Chunks are dispatched to the pool with a bounded number in flight, so
+    memory use does not grow with the file size, and results are written
+    as soon as the oldest outstanding chunk finishes, keeping input order.
+
+    Parameters:
+    input_path (str): Text or CSV file with one reaction per line.
+    output_path (str): CSV file to write with the columns
+    line, reaction, balanced, error.
+    workers (int): Number of worker processes (default: CPU count).
+    chunksize (int): Number of reactions sent to a worker at a time.
+    column (str): CSV column holding the reactions.
+
+    Returns:
+    int: The number of reactions processed.
+    int: The number of reactions that could not be balanced.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    processed = failed = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(
+        output_path, "w", newline=""
+    ) as file_object:
+        writer = csv.writer(file_object)
+        writer.writerow(["line", "reaction", "balanced", "error"])
+        pending = deque()
+
+        def write_oldest():
+            nonlocal processed, failed
+            chunk, future = pending.popleft()
+            for reaction, (balanced, error) in zip(chunk, future.result()):
+                processed += 1
+                failed += bool(error)
+                writer.writerow([processed, reaction, balanced, error])
+
+        for chunk in chunked(read_reactions(input_path, column), chunksize):
+            pending.append((chunk, executor.submit(balance_chunk, chunk)))
+            if len(pending) >= max_in_flight:
+                write_oldest()
+        while pending:
+            write_oldest()
+
+    return processed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chemistry calculator batch mode.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    balance = subparsers.add_parser("balance", help="Balance reactions from a file.")
+    balance.add_argument("input", help="Text file (one reaction per line) or CSV file.")
+    balance.add_argument("output", help="CSV file to write the results to.")
+    balance.add_argument("--workers", type=int, default=None)
+    balance.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    balance.add_argument(
+        "--column", default=None, help="CSV column with the reactions."
+    )
+
+    args = parser.parse_args(argv)
+    processed, failed = balance_file(
+        args.input, args.output, args.workers, args.chunksize, args.column
+    )
+    print(f"Balanced {processed - failed} of {processed} reactions ({failed} errors).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Conformance check and benchmark for balancer.balance_stoichiometry.
+
+Builds a corpus of 1,000 reactions (reaction_corpus.txt plus generated
+combustion reactions), checks that every coefficient matches chempy's
+balance_stoichiometry and reports the time taken by both, with the
+balancer cache both cold and warm.
+
+Run from the Exercises directory:
+    python benchmarks/bench_balancer.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chempy import balance_stoichiometry as chempy_balance
+
+import balancer
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reaction_corpus.txt")
+N_REACTIONS = 1000
+
+
+def split_reaction(line):
+    reactants, products = line.split("->")
+    return (
+        [mol.strip() for mol in reactants.split(" + ")],
+        [mol.strip() for mol in products.split(" + ")],
+    )
+
+
+def load_reactions(n=N_REACTIONS):
+    with open(CORPUS) as file_object:
+        reactions = [split_reaction(line) for line in file_object if line.strip()]
+
+    # Fill up with combustion reactions CxHyOz + O2 -> CO2 + H2O.
+    for carbon in range(1, 40):
+        for hydrogen in range(2, 2 * carbon + 3, 2):
+            for oxygen in range(0, 3):
+                if len(reactions) == n:
+                    return reactions
+                fuel = f"C{carbon}H{hydrogen}" + (f"O{oxygen}" if oxygen else "")
+                reactions.append(([fuel, "O2"], ["CO2", "H2O"]))
+    return reactions
+
+
+def run(balance, reactions):
+    results = []
+    start = time.perf_counter()
+    for reactants, products in reactions:
+        try:
+            reac, prod = balance(reactants, products)
+            results.append(
+                (
+                    {k: int(v) for k, v in reac.items()},
+                    {k: int(v) for k, v in prod.items()},
+                )
+            )
+        except Exception as e:
+            results.append(type(e).__name__)
+    return results, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    reactions = load_reactions()
+
+    balancer.clear_cache()
+    cold, cold_time = run(balancer.balance_stoichiometry, reactions)
+    warm, warm_time = run(balancer.balance_stoichiometry, reactions)
+    expected, chempy_time = run(chempy_balance, reactions)
+
+    mismatches = [
+        (reaction, ref, got)
+        for reaction, ref, got in zip(reactions, expected, cold)
+        if ref != got
+    ]
+    print(
+        f"Conformance: {len(reactions) - len(mismatches)}/{len(reactions)}"
+        " reactions match chempy"
+    )
+    for reaction, ref, got in mismatches[:20]:
+        print(f"  {reaction}: chempy={ref} balancer={got}")
+
+    print(f"chempy:          {chempy_time:8.3f} s")
+    print(f"balancer (cold): {cold_time:8.3f} s  ({chempy_time / cold_time:.0f}x)")
+    print(f"balancer (warm): {warm_time:8.3f} s  ({chempy_time / warm_time:.0f}x)")
+
+    sys.exit(1 if mismatches else 0)
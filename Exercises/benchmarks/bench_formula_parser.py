@@ -0,0 +1,99 @@
+"""
+Conformance check and throughput benchmark for formula_parser.
+
+Every formula in formula_corpus.txt (plus a batch of randomly generated
+formulas) must give the same composition as chempy's pyparsing-based
+formula_to_composition. The benchmark then reports formulas/sec for both.
+
+Run from the Exercises directory:
+    python benchmarks/bench_formula_parser.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chempy.util.parsing import formula_to_composition as chempy_composition
+
+from formula_parser import formula_to_composition
+from periodic_table import SYMBOLS
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "formula_corpus.txt")
+
+
+def load_corpus():
+    with open(CORPUS) as file_object:
+        return [line.strip() for line in file_object if line.strip()]
+
+
+def random_formula(rng, depth=0):
+    # Builds formulas such as 'K2[Fe(CN)6]3·4H2O-2' from random elements.
+    terms = []
+    for _ in range(rng.randint(1, 4)):
+        if depth < 2 and rng.random() < 0.25:
+            opener, closer = rng.choice(["()", "[]", "{}"])
+            terms.append(opener + random_formula(rng, depth + 1) + closer)
+        else:
+            terms.append(rng.choice(SYMBOLS))
+        if rng.random() < 0.6:
+            terms.append(str(rng.randint(2, 12)))
+    formula = "".join(terms)
+    if depth == 0:
+        if rng.random() < 0.2:
+            formula += "·%dH2O" % rng.randint(1, 10)
+        if rng.random() < 0.3:
+            formula += rng.choice(["+", "-", "+2", "-3"])
+        if rng.random() < 0.2:
+            formula += rng.choice(["(s)", "(l)", "(g)", "(aq)"])
+    return formula
+
+
+def check_conformance(formulas):
+    mismatches = []
+    for formula in formulas:
+        try:
+            expected = chempy_composition(formula)
+        except Exception:
+            expected = None
+        try:
+            result = formula_to_composition(formula)
+        except ValueError:
+            result = None
+        if result != expected:
+            mismatches.append((formula, expected, result))
+    return mismatches
+
+
+def formulas_per_second(parse, formulas, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for formula in formulas:
+            parse(formula)
+        best = min(best, time.perf_counter() - start)
+    return len(formulas) / best
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    corpus = load_corpus()
+    generated = [random_formula(rng) for _ in range(2000)]
+
+    mismatches = check_conformance(corpus + generated)
+    print(
+        f"Conformance: {len(corpus) + len(generated) - len(mismatches)}"
+        f"/{len(corpus) + len(generated)} formulas match chempy"
+    )
+    for formula, expected, result in mismatches[:20]:
+        print(f"  {formula}: chempy={expected} parser={result}")
+
+    chempy_rate = formulas_per_second(chempy_composition, corpus, repeat=1)
+    parser_rate = formulas_per_second(formula_to_composition, corpus)
+    print(f"chempy:         {chempy_rate:12,.0f} formulas/sec")
+    print(f"formula_parser: {parser_rate:12,.0f} formulas/sec")
+    print(f"Speedup: {parser_rate / chempy_rate:.1f}x")
+
+    sys.exit(1 if mismatches else 0)
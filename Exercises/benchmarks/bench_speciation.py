@@ -0,0 +1,115 @@
+"""
+Conformance check and scaling benchmark for speciation.SpeciationSystem.
+
+First solves a phosphate buffer with calcium complexation with both
+SpeciationSystem and chempy's EqSystem and compares the concentrations.
+Then builds synthetic systems of M metals and L ligands (each ligand
+protonated, each metal-ligand pair forming ML+ and ML2) with up to several
+hundred species, and reports the Newton iterations, the time per solve and
+the density of the Jacobian for each size.
+
+Run from the Exercises directory:
+    python benchmarks/bench_speciation.py [--sizes 2 5 10 15]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speciation import SpeciationSystem  # noqa: E402
+
+PHOSPHATE = [
+    "H3PO4 = H+ + H2PO4-; 10**-2.15",
+    "H2PO4- = H+ + HPO4-2; 10**-7.20",
+    "HPO4-2 = H+ + PO4-3; 10**-12.35",
+    "Ca+2 + HPO4-2 = CaHPO4; 10**2.7",
+    "H2O = H+ + OH-; 1e-14",
+]
+
+
+def check_against_chempy():
+    from chempy.equilibria import EqSystem
+
+    system = SpeciationSystem(PHOSPHATE)
+    start = time.perf_counter()
+    result = system.solve({"P": 0.013, "Ca": 0.003})
+    ours = time.perf_counter() - start
+
+    # chempy keeps water as a species, so Kw is divided by [H2O].
+    text = "\n".join(PHOSPHATE).replace("1e-14", "1e-14/55.4")
+    start = time.perf_counter()
+    eqsys = EqSystem.from_string(text)
+    init = dict.fromkeys(eqsys.substances, 0.0)
+    init.update({"H3PO4": 0.01, "CaHPO4": 0.003, "H2O": 55.4, "H+": 1e-7})
+    init["OH-"] = 1e-7
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        x, _, _ = eqsys.root(init)
+    theirs = time.perf_counter() - start
+
+    reference = dict(zip(eqsys.substances, x))
+    relative = max(
+        abs(c - reference[name]) / reference[name]
+        for name, c in zip(result.species, result.concentrations)
+        if reference[name] > 1e-12
+    )
+    print(
+        f"Phosphate + Ca: pH {result.pH:.4f} (chempy "
+        f"{-np.log10(reference['H+']):.4f}), largest relative difference "
+        f"{relative:.1e}; {ours * 1000:.1f} ms vs chempy {theirs * 1000:.0f} ms"
+    )
+
+
+def metal_ligand_system(metals, ligands):
+    reactions = ["H2O = H+ + OH-; 1e-14"]
+    balances = {f"M{i}": {f"M{i}+2": 1} for i in range(metals)}
+    balances.update({f"L{j}": {f"HL{j}": 1, f"L{j}-": 1} for j in range(ligands)})
+    balances["Cl"] = {"Cl-": 1}
+    rng = np.random.default_rng(0)
+    for j in range(ligands):
+        reactions.append(f"HL{j} = H+ + L{j}-; 10**-{rng.uniform(3, 10):.2f}")
+    for i in range(metals):
+        for j in range(ligands):
+            one, two = f"M{i}L{j}+", f"M{i}(L{j})2"
+            reactions.append(f"M{i}+2 + L{j}- = {one}; 10**{rng.uniform(1, 6):.2f}")
+            reactions.append(f"{one} + L{j}- = {two}; 10**{rng.uniform(1, 4):.2f}")
+            balances[f"M{i}"].update({one: 1, two: 1})
+            balances[f"L{j}"].update({one: 1, two: 2})
+    system = SpeciationSystem(reactions, mass_balances=balances)
+    # Metal chlorides and neutral HL ligands.
+    totals = {f"M{i}": 1e-3 for i in range(metals)}
+    totals.update({f"L{j}": 5e-3 for j in range(ligands)})
+    totals["Cl"] = 2e-3 * metals
+    return system, totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10, 15])
+    args = parser.parse_args()
+
+    check_against_chempy()
+    print(
+        f"\n{'species':>8} {'Jacobian nnz':>13} {'density':>8} "
+        f"{'iterations':>11} {'ms/solve':>9} {'residual':>9}"
+    )
+    for size in args.sizes:
+        system, totals = metal_ligand_system(size, size)
+        n = len(system.species)
+        nnz = system.jacobian(np.zeros(n)).nnz
+        result = system.solve(totals)
+        start = time.perf_counter()
+        repeats = 5
+        for _ in range(repeats):
+            system.solve(totals)
+        elapsed = (time.perf_counter() - start) / repeats
+        print(
+            f"{n:>8} {nnz:>13} {nnz / n**2:>8.1%} "
+            f"{result.iterations:>11} {elapsed * 1000:>9.1f} {result.residual:>9.1e}"
+        )
@@ -0,0 +1,91 @@
+"""
+Startup benchmark for the console calculators.
+
+Runs each script with `python -X importtime`, measures the wall time until
+the "What would you like to do?" prompt appears on stdout, answers "q", and
+lists the slowest imports that happened before the prompt. Exits non-zero
+if the median time to the first prompt is over the budget (200 ms).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 200]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["console_testv3.py", "console_testv4.py", "console_testv5.py"]
+PROMPT = b"What would you like to do? "
+
+
+def time_to_prompt(script):
+    """
+    Returns the seconds until the first prompt and the -X importtime log.
+    """
+    # The pre-warm thread starts right after the prompt; keep it out of the
+    # import log so only what the user waits for is reported.
+    env = dict(os.environ, CHEMISTRY_PREWARM="0")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-u", script],
+        cwd=HERE,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+    output = b""
+    while PROMPT not in output:
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError(f"{script} exited before showing the prompt")
+        output += chunk
+    elapsed = time.perf_counter() - start
+    _, stderr = process.communicate(b"q\n", timeout=30)
+    return elapsed, stderr.decode()
+
+
+def slowest_imports(importtime_log, n=5):
+    """
+    Returns the n top-level imports with the largest cumulative time (us).
+    """
+    imports = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:n]
+
+
+def interpreter_startup(runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    print(f"Bare interpreter startup: {interpreter_startup(args.runs) * 1000:.0f} ms")
+    failed = False
+    for script in SCRIPTS:
+        results = [time_to_prompt(script) for _ in range(args.runs)]
+        median = statistics.median(elapsed for elapsed, _ in results)
+        status = "ok" if median * 1000 <= args.budget_ms else "OVER BUDGET"
+        failed = failed or status != "ok"
+        print(f"\n{script}: first prompt after {median * 1000:.0f} ms ({status})")
+        for cumulative, name in slowest_imports(results[-1][1]):
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,103 @@
+"""
+Memory benchmark of substance_store.SubstanceStore against chempy Substances.
+
+Builds N random inventory formulas (organics, salts, hydrates and ions)
+and measures, with tracemalloc, the memory kept alive by
+    chempy    a list of Substance.from_formula objects, as
+              calculate_substance_properties creates them;
+    store     one SubstanceStore holding the same formulas.
+The chempy list is built for --baseline-n formulas and scaled up. The
+store's figure leaves out molar_mass's parsed-formula cache, which is
+bounded and shared by every store in the process; its size is printed on
+its own. The molar masses of the two are compared.
+
+Run from the Exercises directory:
+    python benchmarks/bench_substance_store.py [--n 1000000] [--baseline-n 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import molar_mass  # noqa: E402
+from substance_store import SubstanceStore  # noqa: E402
+
+TEMPLATES = [
+    "C{a}H{b}",
+    "C{a}H{b}O{c}",
+    "C{a}H{b}N{c}O{d}",
+    "Na{c}Cl{c}",
+    "Ca{c}(PO4)2",
+    "CuSO4·{c}H2O",
+    "Fe(CN)6-{c}",
+    "K{d}[Fe(CN)6]",
+]
+
+
+def inventory(n, seed=0):
+    rng = np.random.default_rng(seed)
+    template = rng.integers(len(TEMPLATES), size=n)
+    numbers = rng.integers(1, 40, size=(n, 4))
+    return [
+        TEMPLATES[t].format(a=a, b=b + 1, c=c % 5 + 1, d=d % 4 + 1)
+        for t, (a, b, c, d) in zip(template, numbers)
+    ]
+
+
+def measure(build):
+    # Returns the result, the memory it keeps alive, the memory left in the
+    # parse cache and the time taken.
+    molar_mass.clear_cache()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    molar_mass.clear_cache()
+    kept = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, kept, size - kept, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--baseline-n", type=int, default=5000)
+    args = parser.parse_args()
+
+    from chempy import Substance
+
+    formulas = inventory(args.n)
+    nb = min(args.baseline_n, args.n)
+    Substance.from_formula("H2O")  # import chempy's parser outside the timing
+
+    substances, chempy_bytes, _, chempy_time = measure(
+        lambda: [Substance.from_formula(formula) for formula in formulas[:nb]]
+    )
+    store, store_bytes, cache_bytes, store_time = measure(
+        lambda: SubstanceStore(formulas)
+    )
+
+    reference = np.array([float(substance.mass) for substance in substances])
+    difference = np.abs(store.masses[:nb] - reference).max()
+    per_chempy = chempy_bytes / nb
+    per_store = store_bytes / args.n
+
+    print(f"{args.n:,} formulas, {len(set(formulas)):,} distinct")
+    print(
+        f"chempy  {per_chempy:8.0f} bytes/substance  "
+        f"{chempy_time * args.n / nb:7.2f} s   (run on {nb:,}, scaled)"
+    )
+    print(
+        f"store   {per_store:8.1f} bytes/substance  {store_time:7.2f} s   "
+        f"({store.nbytes / args.n:.1f} bytes in the arrays)"
+    )
+    print(f"parse cache {cache_bytes / 2**20:.1f} MiB, shared and bounded")
+    print(f"store vs chempy: {per_chempy / per_store:,.0f}x less memory")
+    print(f"largest molar mass difference: {difference:.1e} g/mol")
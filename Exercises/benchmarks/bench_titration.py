@@ -0,0 +1,111 @@
+"""
+Benchmark of titration.titration_curve against per-point chempy solves.
+
+Titrates acetic acid with NaOH over an N-point volume grid three ways:
+    rebuild     one EqSystem.from_string and one root call per point, which
+                is what calculate_equilibrium_and_ph did for every call;
+    sweep       CompiledEquilibrium.sweep, compiled once and warm-started
+                from the previous point;
+    titration   titration.titration_curve, every point at once.
+The two chempy loops run on --baseline-n points and are scaled up; their
+pH is checked against titration_curve at the same volumes.
+
+Run from the Exercises directory:
+    python benchmarks/bench_titration.py [--n 2000] [--baseline-n 40]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from equilibrium_sweep import CompiledEquilibrium  # noqa: E402
+from titration import Species, dilute, titration_curve  # noqa: E402
+
+KA = 1.8e-5
+EXPRESSION = f"CH3COOH = H+ + CH3COO-; {KA}\nH2O = H+ + OH-; 1e-14/55.4"
+ACETIC_ACID = Species("CH3COOH", (-np.log10(KA),), 0, 0)
+ANALYTE_CONCENTRATION, ANALYTE_VOLUME, TITRANT_CONCENTRATION = 0.1, 25.0, 0.1
+COLUMNS = ["CH3COOH", "OH-", "H+", "H2O"]
+
+
+def initial_conditions(volumes):
+    acid, base = dilute(
+        ANALYTE_CONCENTRATION, ANALYTE_VOLUME, TITRANT_CONCENTRATION, volumes
+    )
+    # NaOH enters as OH-; chempy conserves charge through the composition.
+    ones = np.ones_like(volumes)
+    return np.column_stack([acid, base + 1e-7, 1e-7 * ones, 55.4 * ones])
+
+
+def rebuild(volumes):
+    pH = np.empty(len(volumes))
+    for j, row in enumerate(initial_conditions(volumes)):
+        compiled = CompiledEquilibrium(EXPRESSION)
+        init = dict.fromkeys(compiled.substances, 0.0)
+        init.update(zip(COLUMNS, row))
+        _, pH[j], _ = compiled.solve(init)
+    return pH
+
+
+def sweep(volumes):
+    compiled = CompiledEquilibrium(EXPRESSION)
+    _, pH = compiled.sweep(initial_conditions(volumes), columns=COLUMNS)
+    return pH
+
+
+def vectorized(volumes):
+    return titration_curve(
+        ACETIC_ACID,
+        "NaOH",
+        ANALYTE_CONCENTRATION,
+        ANALYTE_VOLUME,
+        TITRANT_CONCENTRATION,
+        volumes,
+    ).pH
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--baseline-n", type=int, default=40)
+    args = parser.parse_args()
+
+    volumes = np.linspace(0, 50, args.n)
+    sample = volumes[:: max(1, args.n // args.baseline_n)]
+    CompiledEquilibrium(EXPRESSION)  # import and warm up chempy first
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        rebuild_pH, rebuild_time = timed(rebuild, sample)
+        sweep_pH, sweep_time = timed(sweep, sample)
+    curve_pH, curve_time = timed(vectorized, volumes)
+
+    reference = vectorized(sample)
+    print(f"Acetic acid with NaOH, {args.n:,} points")
+    print(f"{'method':<10} {'time (s)':>10} {'max |pH diff|':>14}")
+    scale = args.n / len(sample)
+    for name, elapsed, pH in [
+        ("rebuild", rebuild_time * scale, rebuild_pH),
+        ("sweep", sweep_time * scale, sweep_pH),
+    ]:
+        diff = np.nanmax(np.abs(pH - reference))
+        print(
+            f"{name:<10} {elapsed:>10.3f} {diff:>14.2e}   (run on {len(sample)}, scaled)"
+        )
+    print(f"{'titration':<10} {curve_time:>10.3f}")
+    print(
+        f"titration vs rebuild: {rebuild_time * scale / curve_time:,.0f}x faster, "
+        f"vs sweep: {sweep_time * scale / curve_time:,.0f}x faster"
+    )
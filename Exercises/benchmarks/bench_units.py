@@ -0,0 +1,141 @@
+"""
+Benchmark of per-value quantities objects against one unit tag per array.
+
+Runs a molar-mass and molality pipeline over N formulas three ways:
+    per-value   molar_mass(f) * q.gram / q.mol per formula, then .magnitude,
+                as calculate_substance_properties and the notebooks do;
+    quantities  one quantities array per step;
+    UnitArray   units.UnitArray, converting to quantities only at the end.
+All three use the molar_mass engine, so only the unit handling differs.
+The per-value pipeline is run on --baseline-n values and scaled up. For
+each pipeline the run time, the peak memory traced by tracemalloc and the
+number of quantities objects created are reported.
+
+Usage:
+    python benchmarks/bench_units.py [--n 1000000] [--baseline-n 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quantities as q  # noqa: E402
+
+import units  # noqa: E402
+from molar_mass import molar_mass, molar_masses  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def per_value(formulas, mass_solute_g, mass_solvent_g):
+    molalities = np.empty(len(formulas))
+    for j, formula in enumerate(formulas):
+        mm = molar_mass(formula) * q.gram / q.mol
+        moles = mass_solute_g[j] * q.gram / mm
+        b = moles / (mass_solvent_g[j] * q.gram).rescale(q.kg)
+        molalities[j] = b.simplified.magnitude
+    return molalities
+
+
+def quantities_arrays(formulas, mass_solute_g, mass_solvent_g):
+    mm = molar_masses(formulas) * q.gram / q.mol
+    moles = mass_solute_g * q.gram / mm
+    b = moles / (mass_solvent_g * q.gram).rescale(q.kg)
+    return b.simplified.magnitude
+
+
+def unit_arrays(formulas, mass_solute_g, mass_solvent_g):
+    mm = units.molar_masses_with_units(formulas)
+    b = units.molality(
+        units.UnitArray(mass_solute_g, units.g),
+        mm,
+        units.UnitArray(mass_solvent_g, units.g).to(units.kg),
+    )
+    return b.magnitude
+
+
+def count_quantities(function, *args):
+    # Every new quantities array, scalar or temporary, passes through
+    # Quantity.__array_finalize__.
+    original = q.Quantity.__array_finalize__
+    count = 0
+
+    def counting(self, obj):
+        nonlocal count
+        count += 1
+        return original(self, obj)
+
+    q.Quantity.__array_finalize__ = counting
+    try:
+        function(*args)
+    finally:
+        q.Quantity.__array_finalize__ = original
+    return count
+
+
+def measure(function, *args):
+    """
+    Returns the result, the run time, the peak traced memory and the
+    number of quantities objects created.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak, count_quantities(function, *args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--baseline-n", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with open(os.path.join(HERE, "formula_corpus.txt")) as file_object:
+        corpus = [
+            line.strip()
+            for line in file_object
+            if line.strip() and not line.startswith("#")
+        ][:200]
+    rng = np.random.default_rng(0)
+    formulas = [corpus[j] for j in rng.integers(0, len(corpus), args.n)]
+    mass_solute_g = rng.uniform(1, 20, args.n)
+    mass_solvent_g = rng.uniform(50, 500, args.n)
+    molar_masses(corpus)  # parse the corpus once for every pipeline
+
+    nb = min(args.baseline_n, args.n)
+    base, base_time, base_peak, base_count = measure(
+        per_value, formulas[:nb], mass_solute_g[:nb], mass_solvent_g[:nb]
+    )
+    qa, qa_time, qa_peak, qa_count = measure(
+        quantities_arrays, formulas, mass_solute_g, mass_solvent_g
+    )
+    ua, ua_time, ua_peak, ua_count = measure(
+        unit_arrays, formulas, mass_solute_g, mass_solvent_g
+    )
+
+    assert np.allclose(base, ua[:nb], rtol=1e-12)
+    assert np.allclose(qa, ua, rtol=1e-12)
+
+    scale = args.n / nb
+    print(f"Molar mass + molality for {args.n:,} formulas")
+    print(
+        f"{'pipeline':<12} {'time (s)':>10} {'peak traced MB':>16} "
+        f"{'quantities objects':>20}"
+    )
+    print(
+        f"{'per-value':<12} {base_time * scale:>10.2f} {base_peak / 1e6:>16.1f} "
+        f"{base_count * scale:>20,.0f}   (run on {nb:,}, scaled)"
+    )
+    print(f"{'quantities':<12} {qa_time:>10.2f} {qa_peak / 1e6:>16.1f} {qa_count:>20,}")
+    print(f"{'UnitArray':<12} {ua_time:>10.2f} {ua_peak / 1e6:>16.1f} {ua_count:>20,}")
+    print(f"UnitArray vs per-value: {base_time * scale / ua_time:,.0f}x faster")
@@ -0,0 +1,114 @@
+"""
+Open-loop load test for the equilibrium web app.
+
+Sends requests at a fixed rate (default 1000 req/s) and reports p50/p90/p99
+latency. Latency is measured from the time each request was scheduled, so
+queueing in the client is counted instead of hidden when the server falls
+behind.
+
+Start the server first, e.g.
+    python equilibrium_calculator.py --serve --workers 4
+then run
+    python benchmarks/loadtest_equilibrium.py --rate 1000 --duration 30
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+REACTIONS = [
+    "2A + 4B -> 3C + 10D",
+    "N2 + 3H2 -> 2NH3",
+    "H2 + I2 -> 2HI",
+    "N2O4 -> 2NO2",
+    "CO + 3H2 -> CH4 + H2O",
+]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Client(threading.local):
+    # One keep-alive connection per sender thread.
+    def connection(self, host, port):
+        if not hasattr(self, "conn"):
+            self.conn = http.client.HTTPConnection(host, port, timeout=10)
+        return self.conn
+
+    def reset(self):
+        if hasattr(self, "conn"):
+            self.conn.close()
+            del self.conn
+
+
+def run(url, rate, duration, mode, concurrency):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    client = Client()
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def send(i, scheduled):
+        reaction = REACTIONS[i % len(REACTIONS)]
+        if mode == "api":
+            method, path = "POST", "/api/equilibrium"
+            body = json.dumps({"reaction": reaction})
+            headers = {"Content-Type": "application/json"}
+        else:
+            method, path = "POST", "/"
+            body = urlencode({"reaction": reaction})
+            headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        try:
+            conn = client.connection(host, port)
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except Exception as e:
+            client.reset()
+            ok, response = False, e
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors.append(response)
+
+    n_requests = int(rate * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i in range(n_requests):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, i, scheduled)
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"Target rate:   {rate:,.0f} req/s for {duration:g} s ({mode})")
+    print(f"Achieved rate: {len(latencies) / total:,.0f} req/s")
+    print(f"Errors:        {len(errors)}")
+    for q in (50, 90, 99):
+        print(f"p{q}:           {percentile(latencies, q) * 1000:8.2f} ms")
+    if latencies:
+        print(f"max:           {latencies[-1] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rate", type=float, default=1000)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--mode", choices=["html", "api"], default="html")
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    run(args.url, args.rate, args.duration, args.mode, args.concurrency)
@@ -0,0 +1,333 @@
+"""
+Benchmark suite for every calculator path, with stored baselines.
+
+Each benchmark runs one calculator over a realistic corpus:
+    molar_mass            calculate_substance_properties over formula_corpus.txt
+    balance[4-5|6|7+]     balance_chemical_equation over redox_corpus.txt,
+                          grouped by the number of species, balancer cache cold
+    equilibrium_ph        calculate_equilibrium_and_ph over the weak acids in
+                          acid_base_corpus.txt, each swept over concentrations
+    wk7_parse_reaction    wk7.parse_reaction over the balanced redox reactions
+    flask_view[cold|warm] the equilibrium_calculator "/" view through Flask's
+                          test client, with the response cache cleared or warm
+The memo store is disabled so results measure the computation itself.
+
+A benchmark is repeated for at least --rounds rounds and --min-time seconds;
+the median and minimum time per operation are reported. --save writes the
+results to a JSON baseline, and --compare reads one back and marks every
+benchmark whose minimum is more than --threshold slower; the exit status is
+1 if any did. The minimum is compared because it is the least disturbed by
+other work on the machine.
+
+Run from the Exercises directory:
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --filter balance
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+# Measure the calculators, not the memo store.
+os.environ["CHEMISTRY_MEMO_PATH"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "baseline.json")
+THRESHOLD = 0.3
+SIZES = {"4-5": (4, 5), "6": (6, 6), "7+": (7, None)}
+CONCENTRATIONS = np.logspace(-4, 0, 9)
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Registers a setup function. It prepares its corpus and returns the
+    number of operations and a function that performs them all once.
+    """
+
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def read_corpus(name):
+    with open(os.path.join(HERE, name)) as file_object:
+        return [
+            line.strip()
+            for line in file_object
+            if line.strip() and not line.startswith("#")
+        ]
+
+
+def species_count(reaction):
+    return len(reaction.replace("->", "+").split(" + "))
+
+
+def redox_reactions(size):
+    low, high = SIZES[size]
+    return [
+        reaction
+        for reaction in read_corpus("redox_corpus.txt")
+        if low <= species_count(reaction)
+        and (high is None or species_count(reaction) <= high)
+    ]
+
+
+def balanced_redox_reactions():
+    from console_testv5 import balance_chemical_equation
+
+    return [balance_chemical_equation(r) for r in read_corpus("redox_corpus.txt")]
+
+
+@benchmark("molar_mass")
+def setup_molar_mass():
+    from chempy import Substance
+
+    from console_testv5 import calculate_substance_properties
+
+    formulas = []
+    for formula in read_corpus("formula_corpus.txt"):
+        try:
+            Substance.from_formula(formula)
+        except Exception:
+            continue  # only time formulas chempy accepts
+        formulas.append(formula)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for formula in formulas:
+                calculate_substance_properties(formula)
+
+    return len(formulas), run
+
+
+def make_balance_setup(size):
+    def setup():
+        import balancer
+        from console_testv5 import balance_chemical_equation
+
+        reactions = redox_reactions(size)
+
+        def run():
+            for reaction in reactions:
+                balancer.clear_cache()
+                result = balance_chemical_equation(reaction)
+                if result.startswith("Error"):
+                    raise RuntimeError(f"{reaction}: {result}")
+
+        return len(reactions), run
+
+    return setup
+
+
+for _size in SIZES:
+    benchmark(f"balance[{_size}]")(make_balance_setup(_size))
+
+
+@benchmark("equilibrium_ph")
+def setup_equilibrium_ph():
+    from console_testv5 import calculate_equilibrium_and_ph
+
+    cases = [
+        (expression, float(c))
+        for expression in read_corpus("acid_base_corpus.txt")
+        for c in CONCENTRATIONS
+    ]
+
+    def run():
+        for expression, c in cases:
+            acid = expression.split("=")[0].strip()
+            calculate_equilibrium_and_ph(defaultdict(float, {acid: c}), expression)
+
+    run()  # compile each system once; the web app and menus reuse them too
+    return len(cases), run
+
+
+@benchmark("wk7_parse_reaction")
+def setup_wk7_parse_reaction():
+    from wk7 import parse_reaction
+
+    reactions = balanced_redox_reactions() * 20
+
+    def run():
+        for reaction in reactions:
+            parse_reaction(reaction)
+
+    return len(reactions), run
+
+
+def make_flask_setup(warm):
+    def setup():
+        from equilibrium_calculator import app, response_cache
+
+        client = app.test_client()
+        reactions = balanced_redox_reactions()
+
+        def run():
+            if not warm:
+                response_cache.clear()
+            for reaction in reactions:
+                response = client.post("/", data={"reaction": reaction})
+                if response.status_code != 200:
+                    raise RuntimeError(f"{reaction}: HTTP {response.status_code}")
+
+        response_cache.clear()
+        run()
+        return len(reactions), run
+
+    return setup
+
+
+benchmark("flask_view[cold]")(make_flask_setup(warm=False))
+benchmark("flask_view[warm]")(make_flask_setup(warm=True))
+
+
+def measure(setup, rounds, min_time):
+    """
+    Times a benchmark.
+
+    Returns:
+    dict: ops, rounds, and the median, min and stdev seconds per operation.
+    """
+    ops, run = setup()
+    times = []
+    started = time.perf_counter()
+    while len(times) < rounds or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) / ops)
+    return {
+        "ops": ops,
+        "rounds": len(times),
+        "median": statistics.median(times),
+        "min": min(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def environment():
+    import chempy
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "chempy": chempy.__version__,
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints each benchmark against the baseline.
+
+    Returns:
+    list of str: The names of the benchmarks that regressed.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<22} {'baseline':>11} {'current':>11} {'change':>9}  status")
+    for name in sorted(set(results) | set(baseline)):
+        if name not in results:
+            print(
+                f"{name:<22} {format_time(baseline[name]['min']):>11} {'':>11} {'':>9}  missing"
+            )
+            continue
+        current = results[name]["min"]
+        if name not in baseline:
+            print(f"{name:<22} {'':>11} {format_time(current):>11} {'':>9}  new")
+            continue
+        ratio = current / baseline[name]["min"]
+        if ratio > 1 + threshold:
+            status = "REGRESSED"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            status = "improved"
+        else:
+            status = "ok"
+        print(
+            f"{name:<22} {format_time(baseline[name]['min']):>11} "
+            f"{format_time(current):>11} {ratio - 1:>+9.1%}  {status}"
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filter", default="", help="Only run names containing this.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    parser.add_argument("--save", nargs="?", const=BASELINE, default=None)
+    parser.add_argument("--compare", nargs="?", const=BASELINE, default=None)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="Allowed slowdown of the minimum, e.g. 0.3 for 30%%.",
+    )
+    args = parser.parse_args()
+    if args.threshold < 0:
+        parser.error("--threshold must not be negative")
+
+    results = {}
+    print(
+        f"{'benchmark':<22} {'ops':>5} {'rounds':>7} {'median/op':>11} {'min/op':>11}"
+    )
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        result = measure(setup, args.rounds, args.min_time)
+        results[name] = result
+        print(
+            f"{name:<22} {result['ops']:>5} {result['rounds']:>7} "
+            f"{format_time(result['median']):>11} {format_time(result['min']):>11}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as file_object:
+            json.dump(
+                {"environment": environment(), "benchmarks": results},
+                file_object,
+                indent=2,
+            )
+            file_object.write("\n")
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file_object:
+            saved = json.load(file_object)
+        baseline = {
+            name: result
+            for name, result in saved["benchmarks"].items()
+            if args.filter in name
+        }
+        print(f"Baseline: {args.compare} ({saved['environment']['timestamp']})")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(
+                f"\n{len(regressions)} benchmark(s) more than {args.threshold:.0%} "
+                f"slower: {', '.join(regressions)}"
+            )
+            sys.exit(1)
+        print(f"\nNo benchmark is more than {args.threshold:.0%} slower.")
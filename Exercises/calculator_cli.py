@@ -0,0 +1,166 @@
+"""
+Non-interactive JSON Lines interface to the chemistry calculators.
+
+Each subcommand reads one JSON object per line from stdin (or a file) and
+writes one JSON object per line to stdout, in input order:
+
+    python calculator_cli.py molar-mass  < formulas.jsonl
+        {"formula": "H2SO4"}             -> {"formula": "H2SO4", "molar_mass": 98.072, "unit": "g/mol"}
+    python calculator_cli.py balance     < reactions.jsonl
+        {"reaction": "H2 + O2 -> H2O"}   -> {"reaction": ..., "balanced": "2 H2 + 1 O2 -> 2 H2O"}
+    python calculator_cli.py equilibrium < systems.jsonl
+        {"expression": "HC2H3O2 = H+ + C2H3O2-; 1.8*10**-5",
+         "initial": {"HC2H3O2": 0.2, "H+": 1e-7, "C2H3O2-": 0.1}}
+                                         -> {..., "concentrations": {...}, "pH": 4.44, "h_concentration": 3.6e-05}
+
+A bare JSON string is accepted in place of {"formula": ...} or
+{"reaction": ...}, and an "id" field is copied to the output. A record
+that fails gets an "error" field instead of stopping the stream. Input is
+read and output written in chunks, so memory use does not depend on the
+input size.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from itertools import islice
+
+CHUNKSIZE = 1024
+
+
+def _field(record, name):
+    # Bare strings stand for the command's main field.
+    if isinstance(record, str):
+        return {name: record}
+    return record
+
+
+def molar_mass_record(record):
+    """
+    Molar mass of {"formula": ...} in g/mol.
+
+    Uses the cached engine in molar_mass.py rather than building a chempy
+    Substance per record; the values match calculate_substance_properties.
+    """
+    from molar_mass import molar_mass
+
+    record = _field(record, "formula")
+    return {"molar_mass": molar_mass(record["formula"]), "unit": "g/mol"}
+
+
+def balance_record(record):
+    """
+    Balanced form of {"reaction": ...}, as balance_chemical_equation prints it.
+    """
+    from batch_balance import balance_line
+
+    record = _field(record, "reaction")
+    balanced, error = balance_line(record["reaction"])
+    return {"error": error} if error else {"balanced": balanced}
+
+
+def equilibrium_record(record):
+    """
+    Equilibrium concentrations and pH of {"expression": ..., "initial": {...}}.
+    """
+    from console_testv5 import calculate_equilibrium_and_ph
+
+    initial = defaultdict(float, record.get("initial", {}))
+    conc, pH, h_concentration = calculate_equilibrium_and_ph(
+        initial, record["expression"]
+    )
+    return {
+        "concentrations": {name: float(value) for name, value in conc.items()},
+        "pH": float(pH),
+        "h_concentration": float(h_concentration),
+    }
+
+
+COMMANDS = {
+    "molar-mass": (molar_mass_record, "formula"),
+    "balance": (balance_record, "reaction"),
+    "equilibrium": (equilibrium_record, "expression"),
+}
+
+
+def process_line(line, handler, key):
+    """
+    Runs a handler on one input line.
+
+    Returns:
+    str: The output line.
+    bool: Whether the record failed.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return json.dumps({"error": f"Invalid JSON: {e}"}), True
+
+    output = {}
+    if isinstance(record, dict):
+        if "id" in record:
+            output["id"] = record["id"]
+        if key in record:
+            output[key] = record[key]
+    else:
+        output[key] = record
+    try:
+        output.update(handler(record))
+    except Exception as e:
+        output["error"] = f"{type(e).__name__}: {e}"
+    return json.dumps(output), "error" in output
+
+
+def run(command, input_file, output_file, chunksize=CHUNKSIZE):
+    """
+    Streams JSON Lines through one calculator.
+
+    Parameters:
+    command (str): "molar-mass", "balance" or "equilibrium".
+    input_file (file): Text stream with one JSON value per line.
+    output_file (file): Text stream the results are written to.
+    chunksize (int): Number of lines read and written at a time.
+
+    Returns:
+    int: The number of records processed.
+    int: The number of records with an error.
+    """
+    handler, key = COMMANDS[command]
+    processed = failed = 0
+    lines = (line for line in input_file if line.strip())
+    while True:
+        chunk = list(islice(lines, chunksize))
+        if not chunk:
+            break
+        results = [process_line(line, handler, key) for line in chunk]
+        failed += sum(error for _, error in results)
+        processed += len(results)
+        output_file.write("\n".join(result for result, _ in results) + "\n")
+        output_file.flush()
+    return processed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Chemistry calculators over JSON Lines (stdin -> stdout)."
+    )
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument(
+        "input", nargs="?", default="-", help="JSON Lines file (default: stdin)."
+    )
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        processed, failed = run(args.command, sys.stdin, sys.stdout, args.chunksize)
+    else:
+        with open(args.input) as input_file:
+            processed, failed = run(
+                args.command, input_file, sys.stdout, args.chunksize
+            )
+    print(f"{processed} records, {failed} errors", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
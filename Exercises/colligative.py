@@ -0,0 +1,252 @@
+"""
+Vectorized colligative properties: freezing-point depression, boiling-point
+elevation and osmotic pressure.
+
+The notebook's calculate_freezing_point_depression handles one salt at a
+time through Substance.molar_mass(). The functions here take arrays (or
+DataFrame columns) of solutes, masses, solvents and van't Hoff factors and
+compute every row with NumPy broadcasting. Each distinct formula is parsed
+once (molar_mass.molar_masses) and the masses are gathered back to the rows,
+so a lab dataset with millions of rows but a few hundred solutes costs
+little more than the arithmetic.
+
+Example:
+    delta_Tf, Tf = freezing_point_depression(["NaCl", "CaCl2"], [5.0, 8.0],
+                                             [100.0, 150.0], i=[2, 3])
+"""
+
+import numpy as np
+import pandas as pd
+
+from molar_mass import molar_masses
+
+# L·atm/(mol·K)
+GAS_CONSTANT = 0.082057366
+
+# Kf and Kb in °C·kg/mol, normal freezing and boiling points in °C.
+SOLVENT_COLUMNS = ("Kf", "Kb", "freezing_point", "boiling_point")
+SOLVENTS = {
+    name: dict(zip(SOLVENT_COLUMNS, values))
+    for name, values in {
+        "water": (1.86, 0.512, 0.0, 100.0),
+        "benzene": (5.12, 2.53, 5.5, 80.1),
+        "cyclohexane": (20.0, 2.79, 6.5, 80.7),
+        "acetic acid": (3.90, 3.07, 16.6, 117.9),
+        "ethanol": (1.99, 1.22, -114.6, 78.4),
+        "chloroform": (4.68, 3.63, -63.5, 61.2),
+        "camphor": (37.7, 5.95, 179.8, 204.0),
+    }.items()
+}
+
+
+def _factorize(values):
+    # factorize hashes instead of sorting, which matters for 10M strings,
+    # and reads the codes of a categorical column directly. Missing values
+    # (None, NaN) get code -1.
+    if not isinstance(values, (pd.Series, pd.Index, pd.Categorical)):
+        values = np.asarray(values, dtype=object).ravel()
+    return pd.factorize(values, use_na_sentinel=True)
+
+
+def _gather(table, codes):
+    # table[codes] along the first axis, with NaN for the -1 (missing) codes
+    # instead of the last row.
+    table = np.asarray(table, dtype=float)
+    padded = np.concatenate([table, np.full((1,) + table.shape[1:], np.nan)])
+    return padded[np.where(codes < 0, len(table), codes)]
+
+
+def molar_mass_lookup(solutes):
+    """
+    Returns the molar mass of every row, parsing each distinct formula once.
+
+    Parameters:
+    solutes (str or array-like of str): Chemical formulas, one per row.
+
+    Returns:
+    numpy.ndarray: The molar masses in g/mol; NaN for missing solutes.
+    """
+    if isinstance(solutes, str):
+        return molar_masses([solutes])[0]
+    codes, uniques = _factorize(solutes)
+    masses = _gather(molar_masses(uniques), codes)
+    return masses.reshape(np.shape(solutes))
+
+
+def solvent_constants(solvent):
+    """
+    Looks up the SOLVENTS constants for one solvent or an array of them.
+
+    Parameters:
+    solvent (str or array-like of str): Solvent names, e.g. "water".
+
+    Returns:
+    dict: "Kf", "Kb", "freezing_point" and "boiling_point", each a float
+    or an array with one value per row; NaN for missing solvents.
+    """
+    if isinstance(solvent, str):
+        return SOLVENTS[solvent.lower()]
+    codes, uniques = _factorize(solvent)
+    try:
+        table = np.array(
+            [[SOLVENTS[s.lower()][c] for c in SOLVENT_COLUMNS] for s in uniques]
+        ).reshape(len(uniques), len(SOLVENT_COLUMNS))
+    except KeyError as e:
+        raise ValueError(f"Unknown solvent {e}; known: {sorted(SOLVENTS)}")
+    shape = np.shape(solvent)
+    rows = _gather(table, codes)
+    return {name: rows[:, k].reshape(shape) for k, name in enumerate(SOLVENT_COLUMNS)}
+
+
+def molality(solutes, mass_solute_g, mass_solvent_g):
+    """
+    Molality in mol/kg of mass_solute_g of each solute in mass_solvent_g of
+    solvent.
+    """
+    moles = np.asarray(mass_solute_g, dtype=float) / molar_mass_lookup(solutes)
+    return moles / (np.asarray(mass_solvent_g, dtype=float) / 1000)
+
+
+def freezing_point_depression(
+    solutes, mass_solute_g, mass_solvent_g, Kf=None, i=1, solvent="water"
+):
+    """
+    Calculate the freezing point depression ΔTf = Kf x m x i for every row.
+
+    Parameters:
+    solutes (array-like of str): The formulas of the solutes.
+    mass_solute_g (array-like): The masses of solute in grams.
+    mass_solvent_g (array-like): The masses of solvent in grams.
+    Kf (float or array-like): °C·kg/mol; looked up from solvent if None.
+    i (float or array-like): The van't Hoff factors.
+    solvent (str or array-like of str): Names from SOLVENTS.
+
+    Returns:
+    numpy.ndarray: ΔTf in °C.
+    numpy.ndarray: The freezing points of the solutions in °C.
+    """
+    constants = solvent_constants(solvent)
+    if Kf is None:
+        Kf = constants["Kf"]
+    m = molality(solutes, mass_solute_g, mass_solvent_g)
+    delta_Tf = np.asarray(Kf, dtype=float) * m * np.asarray(i, dtype=float)
+    return delta_Tf, constants["freezing_point"] - delta_Tf
+
+
+def boiling_point_elevation(
+    solutes, mass_solute_g, mass_solvent_g, Kb=None, i=1, solvent="water"
+):
+    """
+    Calculate the boiling point elevation ΔTb = Kb x m x i for every row.
+
+    Parameters are as for freezing_point_depression, with Kb in place of Kf.
+
+    Returns:
+    numpy.ndarray: ΔTb in °C.
+    numpy.ndarray: The boiling points of the solutions in °C.
+    """
+    constants = solvent_constants(solvent)
+    if Kb is None:
+        Kb = constants["Kb"]
+    m = molality(solutes, mass_solute_g, mass_solvent_g)
+    delta_Tb = np.asarray(Kb, dtype=float) * m * np.asarray(i, dtype=float)
+    return delta_Tb, constants["boiling_point"] + delta_Tb
+
+
+def osmotic_pressure(solutes, mass_solute_g, volume_L, temperature_K=298.15, i=1):
+    """
+    Calculate the osmotic pressure Π = i x M x R x T for every row.
+
+    Parameters:
+    solutes (array-like of str): The formulas of the solutes.
+    mass_solute_g (array-like): The masses of solute in grams.
+    volume_L (array-like): The volumes of solution in liters.
+    temperature_K (float or array-like): The temperatures in kelvin.
+    i (float or array-like): The van't Hoff factors.
+
+    Returns:
+    numpy.ndarray: The osmotic pressures in atm.
+    """
+    moles = np.asarray(mass_solute_g, dtype=float) / molar_mass_lookup(solutes)
+    molarity = moles / np.asarray(volume_L, dtype=float)
+    return (
+        np.asarray(i, dtype=float)
+        * molarity
+        * GAS_CONSTANT
+        * np.asarray(temperature_K, dtype=float)
+    )
+
+
+def colligative_properties(df):
+    """
+    Adds colligative property columns to a DataFrame of solutions.
+
+    Parameters:
+    df (pandas.DataFrame): Columns "solute", "mass_solute_g" and
+    "mass_solvent_g", and optionally "solvent" (default water), "i"
+    (default 1), "volume_L" and "temperature_K" (for osmotic pressure).
+
+    Returns:
+    pandas.DataFrame: A copy of df with molality, delta_Tf, Tf, delta_Tb,
+    Tb and, if volume_L is given, osmotic_pressure_atm.
+
+    Storing solute and solvent as category columns makes the lookups
+    several times faster on large frames.
+    """
+    solutes = df["solute"]
+    solvent = df["solvent"] if "solvent" in df else "water"
+    i = df["i"].to_numpy() if "i" in df else 1
+    mass_solute = df["mass_solute_g"].to_numpy()
+    mass_solvent = df["mass_solvent_g"].to_numpy()
+
+    # Look the molar masses up once and reuse them for every property.
+    moles = mass_solute / molar_mass_lookup(solutes)
+    m = moles / (mass_solvent / 1000)
+    constants = solvent_constants(solvent)
+    delta_Tf = constants["Kf"] * m * i
+    delta_Tb = constants["Kb"] * m * i
+
+    out = df.copy()
+    out["molality"] = m
+    out["delta_Tf"] = delta_Tf
+    out["Tf"] = constants["freezing_point"] - delta_Tf
+    out["delta_Tb"] = delta_Tb
+    out["Tb"] = constants["boiling_point"] + delta_Tb
+    if "volume_L" in df:
+        T = df["temperature_K"].to_numpy() if "temperature_K" in df else 298.15
+        out["osmotic_pressure_atm"] = (
+            i * moles / df["volume_L"].to_numpy() * GAS_CONSTANT * T
+        )
+    return out
+
+
+if __name__ == "__main__":
+    import time
+
+    # The notebook's examples: 5.00 g NaCl in 100 g ice, 8.00 g CaCl2 in 150 g.
+    delta_Tf, Tf = freezing_point_depression(
+        ["NaCl", "CaCl2"], [5.00, 8.00], [100.0, 150.0], i=[2, 3]
+    )
+    for formula, d, t in zip(["NaCl", "CaCl2"], delta_Tf, Tf):
+        print(f"{formula}: ΔTf = {d:.2f} °C, freezing point = {t:.2f} °C")
+
+    n = 10_000_000
+    rng = np.random.default_rng(0)
+    formulas = np.array(["NaCl", "CaCl2", "KBr", "C6H12O6", "MgSO4", "C12H22O11"])
+    df = pd.DataFrame(
+        {
+            "solute": pd.Categorical.from_codes(
+                rng.integers(0, len(formulas), n), formulas
+            ),
+            "mass_solute_g": rng.uniform(1, 20, n),
+            "mass_solvent_g": rng.uniform(50, 500, n),
+            "solvent": pd.Categorical.from_codes(
+                rng.integers(0, len(SOLVENTS), n), list(SOLVENTS)
+            ),
+            "i": rng.integers(1, 4, n).astype(float),
+        }
+    )
+    start = time.perf_counter()
+    result = colligative_properties(df)
+    elapsed = time.perf_counter() - start
+    print(f"{n:,} rows in {elapsed:.2f} s ({n / elapsed:,.0f} rows/s)")
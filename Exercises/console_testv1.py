@@ -1,7 +1,6 @@
 # https://introtopython.org/terminal_apps.html
 
 import os
-import pickle
 
 from chempy import Substance
 import quantities as q
@@ -9,6 +8,8 @@ import quantities as q
 import re
 from sympy import Matrix, lcm
 
+from name_store import NameStore
+
 # Greeter is a terminal application that greets old friends warmly,
 #   and remembers new friends.
 
@@ -64,21 +65,14 @@ def get_new_name():
     if new_name in names:
         print("\n%s is an old friend! Thank you, though." % new_name.title())
     else:
-        names.append(new_name)
+        names.add(new_name)
         print("\nI'm so happy to know %s!\n" % new_name.title())
 
 
 def load_names():
-    # This function loads names from a file, and puts them in the list 'names'.
-    #  If the file doesn't exist, it creates an empty list.
-    try:
-        file_object = open("names.pydata", "rb")
-        names = pickle.load(file_object)
-        file_object.close()
-        return names
-    except Exception as e:
-        print(e)
-        return []
+    # This function opens the names database (names.sqlite3), creating it if
+    #  needed and copying in any names from the old names.pydata pickle.
+    return NameStore()
 
 
 def choice_1():
@@ -94,21 +88,18 @@ def choice_3():
 
 
 def quit():
-    # This function dumps the names into a file, and prints a quit message.
-    try:
-        file_object = open("names.pydata", "wb")
-        pickle.dump(names, file_object)
-        file_object.close()
-        print("\nThanks for using this program.")
-    except Exception as e:
-        print("\nThanks for playing. I won't be able to remember these names.")
-        print(e)
+    # Names are saved as they are added, so this only closes the session
+    #  and prints a quit message.
+    names.end_session(session_id)
+    names.close()
+    print("\nThanks for using this program.")
 
 
 ### MAIN PROGRAM ###
 
 # Set up a loop where users can choose what they'd like to do.
 names = load_names()
+session_id = names.start_session("console_testv1")
 
 choice = ""
 display_title_bar()
@@ -3,19 +3,16 @@
 import os
 import pickle
 
-from chempy import Substance
-import quantities as q
-
 import re
-from sympy import Matrix, lcm
-
-from chempy import balance_stoichiometry
-
 
 from collections import defaultdict
-from chempy.equilibria import EqSystem
 from math import log10
 
+from prewarm import start_prewarm
+
+# Loaded lazily by the menu actions; see prewarm.py.
+PREWARM_MODULES = ["balancer", "quantities", "chempy", "chempy.equilibria"]
+
 # Greeter is a terminal application that greets old friends warmly,
 #   and remembers new friends.
 
@@ -32,6 +29,9 @@ def calculate_substance_properties(formula):
     Returns:
       None. substance's unicode name and molar mass in g/mol.
     """
+    import quantities as q
+    from chempy import Substance
+
     substance = Substance.from_formula(formula)
     mass_with_units = substance.mass * q.gram / q.mol  # Store mass with units
     print("mass with units: %s" % mass_with_units)
@@ -53,13 +53,14 @@ def get_user_choice():
     print("[2] Balance Chemical Equation.")
     print("[3] Calculate Concentration of an Equilibrium Reaction.")
     print("[q] Quit.")
+    start_prewarm(PREWARM_MODULES)
 
     return input("What would you like to do? ")
 
 
 def balance_chemical_equation(reaction_string):
     """
-    Balances a chemical equation using chempy.
+    Balances a chemical equation using the integer balancer in balancer.py.
 
     Parameters:
     reaction_string (str): A string representing the chemical equation, e.g., "H2 + O2 -> H2O".
@@ -67,6 +68,8 @@ def balance_chemical_equation(reaction_string):
     Returns:
     str: A string representing the balanced chemical equation or an error message if balancing fails.
     """
+    from balancer import balance_stoichiometry
+
     print("you choose two")
 
     try:
@@ -130,6 +133,8 @@ def calculate_equilibrium_and_ph(initial_concentrations, equilibrium_expression)
     float: The H+ concentration at equilibrium.
     """
 
+    from chempy.equilibria import EqSystem
+
     # Define the equilibrium system
     eqsys = EqSystem.from_string(equilibrium_expression)
 
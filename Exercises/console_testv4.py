@@ -1,10 +1,12 @@
-from chempy import Substance
-import quantities as q
-from chempy import balance_stoichiometry
 from collections import defaultdict
-from chempy.equilibria import EqSystem
 from math import log10
 
+from prewarm import start_prewarm
+
+# Heavy modules are imported by the menu actions and pre-warmed in the
+# background once the menu has been shown (see prewarm.py).
+PREWARM_MODULES = ["balancer", "quantities", "chempy", "chempy.equilibria"]
+
 
 def calculate_substance_properties(formula):
     """Calculates and prints properties of a chemical substance.
@@ -15,6 +17,9 @@ def calculate_substance_properties(formula):
     Returns:
       None. substance's unicode name and molar mass in g/mol.
     """
+    import quantities as q
+    from chempy import Substance
+
     substance = Substance.from_formula(formula)
     mass_with_units = substance.mass * q.gram / q.mol  # Store mass with units
     print("mass with units: %s" % mass_with_units)
@@ -34,13 +39,14 @@ def get_user_choice():
     print("[2] Balance Chemical Equation.")
     print("[3] Calculate Concentration of an Equilibrium Reaction.")
     print("[q] Quit.")
+    start_prewarm(PREWARM_MODULES)
 
     return input("What would you like to do? ")
 
 
 def balance_chemical_equation(reaction_string):
     """
-    Balances a chemical equation using chempy.
+    Balances a chemical equation using the integer balancer in balancer.py.
 
     Parameters:
     reaction_string (str): A string representing the chemical equation, e.g., "H2 + O2 -> H2O".
@@ -48,6 +54,8 @@ def balance_chemical_equation(reaction_string):
     Returns:
     str: A string representing the balanced chemical equation or an error message if balancing fails.
     """
+    from balancer import balance_stoichiometry
+
     print("you choose two")
 
     try:
@@ -109,6 +117,8 @@ def calculate_equilibrium_and_ph(initial_concentrations, equilibrium_expression)
     float: The pH of the solution.
     float: The H+ concentration at equilibrium.
     """
+    from chempy.equilibria import EqSystem
+
     # Define the equilibrium system
     eqsys = EqSystem.from_string(equilibrium_expression)
 
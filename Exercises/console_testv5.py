@@ -1,11 +1,43 @@
-from chempy import Substance
-import quantities as q
-from chempy import balance_stoichiometry
+import json
+import warnings
 from collections import defaultdict
-from chempy.equilibria import EqSystem
 from math import log10
 
+from metrics import count_error, timed, timer
+from prewarm import start_prewarm
 
+# chempy, quantities and the balancer take about half a second to import,
+# so they are imported inside the menu actions that use them and pre-warmed
+# in the background once the menu is on screen.
+PREWARM_MODULES = [
+    "balancer",
+    "quantities",
+    "chempy",
+    "eqsys_cache",
+    "equilibrium_sweep",
+]
+
+
+def memoized(operation, key, compute, cacheable=None):
+    """
+    Returns compute() through the shared memo store (see memo_store.py).
+
+    Parameters:
+    operation (str): The calculator, e.g. "molar_mass".
+    key (str): The normalized input.
+    compute (callable): Calculates the JSON-serializable result on a miss.
+    cacheable (callable): If given, only results for which it returns True
+    are stored.
+    """
+    from memo_store import get_default_store
+
+    store = get_default_store()
+    if store is None:
+        return compute()
+    return store.get_or_compute(operation, key, compute, cacheable)
+
+
+@timed("chemistry_operation_seconds", operation="molar_mass")
 def calculate_substance_properties(formula):
     """Calculates and prints properties of a chemical substance.
 
@@ -15,10 +47,23 @@ def calculate_substance_properties(formula):
     Returns:
       None. substance's unicode name and molar mass in g/mol.
     """
-    substance = Substance.from_formula(formula)
-    mass_with_units = substance.mass * q.gram / q.mol  # Store mass with units
+    import quantities as q
+
+    def compute():
+        from chempy import Substance
+
+        with timer("chemistry_stage_seconds", operation="molar_mass", stage="parse"):
+            substance = Substance.from_formula(formula)
+        return [substance.unicode_name, float(substance.mass)]
+
+    try:
+        unicode_name, mass = memoized("molar_mass", "".join(formula.split()), compute)
+    except Exception as e:
+        count_error("molar_mass", e)
+        raise
+    mass_with_units = mass * q.gram / q.mol  # Store mass with units
     print("mass with units: %s" % mass_with_units)
-    return (substance.unicode_name, mass_with_units)
+    return (unicode_name, mass_with_units)
 
 
 def display_title_bar():
@@ -32,12 +77,43 @@ def get_user_choice():
     print("[2] Balance Chemical Equation.")
     print("[3] Calculate Concentration of an Equilibrium Reaction.")
     print("[q] Quit.")
+    start_prewarm(PREWARM_MODULES)
     return input("What would you like to do? ").strip().lower()
 
 
+def parse_chemical_equation(reaction_string):
+    """
+    Splits a chemical equation into its reactants and products.
+
+    Parameters:
+    reaction_string (str): A string representing the chemical equation, e.g., "H2 + O2 -> H2O".
+
+    Returns:
+    dict: The reactant formulas, each with a coefficient of 1.
+    dict: The product formulas, each with a coefficient of 1.
+    """
+    # Parse reactants and products and split by "->"
+    reactants, products = reaction_string.split("->")
+    reactants = {mol.strip(): 1 for mol in reactants.split("+")}
+    products = {mol.strip(): 1 for mol in products.split("+")}
+    return reactants, products
+
+
+def format_chemical_equation(reactants, products):
+    """
+    Formats balanced reactants and products as "2 H2 + 1 O2 -> 2 H2O".
+    """
+    return (
+        " + ".join([f"{coeff} {mol}" for mol, coeff in reactants.items()])
+        + " -> "
+        + " + ".join([f"{coeff} {mol}" for mol, coeff in products.items()])
+    )
+
+
+@timed("chemistry_operation_seconds", operation="balance")
 def balance_chemical_equation(reaction_string):
     """
-    Balances a chemical equation using chempy.
+    Balances a chemical equation using the integer balancer in balancer.py.
 
     Parameters:
     reaction_string (str): A string representing the chemical equation, e.g., "H2 + O2 -> H2O".
@@ -45,24 +121,25 @@ def balance_chemical_equation(reaction_string):
     Returns:
     str: A string representing the balanced chemical equation or an error message if balancing fails.
     """
-    try:
-        # Parse reactants and products and split by "->"
-        reactants, products = reaction_string.split("->")
-        reactants = {mol.strip(): 1 for mol in reactants.split("+")}
-        products = {mol.strip(): 1 for mol in products.split("+")}
-        balanced_reactants, balanced_products = balance_stoichiometry(
-            reactants, products
-        )
+    from balancer import balance_stoichiometry
 
-        return (
-            " + ".join([f"{coeff} {mol}" for mol, coeff in balanced_reactants.items()])
-            + " -> "
-            + " + ".join([f"{coeff} {mol}" for mol, coeff in balanced_products.items()])
-        )
+    def compute():
+        with timer("chemistry_stage_seconds", operation="balance", stage="parse"):
+            reactants, products = parse_chemical_equation(reaction_string)
+        with timer("chemistry_stage_seconds", operation="balance", stage="balance"):
+            balanced_reactants, balanced_products = balance_stoichiometry(
+                reactants, products
+            )
+        return format_chemical_equation(balanced_reactants, balanced_products)
+
+    try:
+        return memoized("balance", " ".join(reaction_string.split()), compute)
     except Exception as e:
+        count_error("balance", e)
         return f"Error balancing equation: {e}"
 
 
+@timed("chemistry_operation_seconds", operation="equilibrium")
 def calculate_equilibrium_and_ph(initial_concentrations, equilibrium_expression):
     """
     Calculate equilibrium concentrations and pH from given initial concentrations and equilibrium expression.
@@ -76,15 +153,44 @@ def calculate_equilibrium_and_ph(initial_concentrations, equilibrium_expression)
     float: The pH of the solution.
     float: The H+ concentration at equilibrium.
     """
-    eqsys = EqSystem.from_string(equilibrium_expression)
-    arr, _, _ = eqsys.root(initial_concentrations)
-    conc = dict(zip(eqsys.substances, arr))
+    from eqsys_cache import get_compiled_equilibrium, normalize_expression
+
+    converged = True
+
+    def compute():
+        nonlocal converged
+        # Parsed and compiled systems are reused across calls (see eqsys_cache.py)
+        with timer("chemistry_stage_seconds", operation="equilibrium", stage="parse"):
+            compiled = get_compiled_equilibrium(equilibrium_expression)
+        with timer("chemistry_stage_seconds", operation="equilibrium", stage="solve"):
+            arr, info, _ = compiled.eqsys.root(
+                initial_concentrations, neqsys=compiled.neqsys
+            )
+        converged = bool(info["success"])
+        return dict(zip(compiled.substances, arr.tolist()))
+
+    key = json.dumps(
+        [
+            normalize_expression(equilibrium_expression),
+            sorted((name, float(c)) for name, c in initial_concentrations.items()),
+        ]
+    )
+    try:
+        # A solve that did not converge is returned as before but not stored.
+        conc = memoized("equilibrium", key, compute, lambda value: converged)
+    except Exception as e:
+        count_error("equilibrium", e)
+        raise
+    if not converged:
+        warnings.warn(
+            f"The equilibrium solver did not converge for {equilibrium_expression!r}"
+        )
     pH = -log10(conc.get("H+", 1e-7))
     h_concentration = conc.get("H+", 1e-7)
     return conc, pH, h_concentration
 
 
-def calculate_equilibrium_and_ph():
+def equilibrium_menu():
     """
     Handles user input for calculating equilibrium and pH.
     """
@@ -125,25 +231,26 @@ def calculate_equilibrium_and_ph():
 
 
 ### MAIN PROGRAM ###
-display_title_bar()
-choice = ""
-while choice != "q":
-    choice = get_user_choice()
+if __name__ == "__main__":
     display_title_bar()
+    choice = ""
+    while choice != "q":
+        choice = get_user_choice()
+        display_title_bar()
 
-    if choice == "1":
-        chemical_formula = input("Enter your chemical formula (e.g., NaCl, H2O): ")
-        calculate_substance_properties(chemical_formula)
+        if choice == "1":
+            chemical_formula = input("Enter your chemical formula (e.g., NaCl, H2O): ")
+            calculate_substance_properties(chemical_formula)
 
-    elif choice == "2":
-        reaction_string = input(
-            "Enter the chemical reaction to balance (e.g., H2 + O2 -> H2O): "
-        )
-        balanced_reaction_string = balance_chemical_equation(reaction_string)
-        print("Balanced Reaction:", balanced_reaction_string)
+        elif choice == "2":
+            reaction_string = input(
+                "Enter the chemical reaction to balance (e.g., H2 + O2 -> H2O): "
+            )
+            balanced_reaction_string = balance_chemical_equation(reaction_string)
+            print("Balanced Reaction:", balanced_reaction_string)
 
-    elif choice == "3":
-        calculate_equilibrium_and_ph()
+        elif choice == "3":
+            equilibrium_menu()
 
-    elif choice == "q":
-        print("\nHave a good day!")
+        elif choice == "q":
+            print("\nHave a good day!")
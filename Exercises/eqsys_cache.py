@@ -0,0 +1,161 @@
+"""
+Bounded LRU cache of compiled equilibrium systems.
+
+Parsing "HC2H3O2 = H+ + C2H3O2-; 1.8*10**-5" into an EqSystem and building
+its nonlinear system costs more than solving it for small systems, so the
+compiled systems are kept in memory keyed by the normalized expression.
+
+Set the EQSYS_CACHE_PATH environment variable (or pass path=...) to keep
+the parsed systems on disk between runs: the cache is loaded on first use
+and saved when the process exits.
+"""
+
+import atexit
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 128
+
+
+def normalize_expression(equilibrium_expression):
+    """
+    Normalize an equilibrium expression for use as a cache key.
+
+    Runs of whitespace are collapsed to one space (chempy needs the spaces
+    around '+' and '='), and the spacing after ';' is made uniform.
+    """
+    expression = " ".join(equilibrium_expression.split())
+    if ";" in expression:
+        reaction, constant = expression.split(";", 1)
+        expression = f"{reaction.strip()}; {constant.strip()}"
+    return expression
+
+
+class EquilibriumCache:
+    """
+    LRU cache mapping normalized expressions to CompiledEquilibrium objects.
+
+    Parameters:
+    maxsize (int): The maximum number of compiled systems to keep.
+    path (str): Optional pickle file to load from and save to.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # The on-disk cache is read on first use, not at import time.
+        self._loaded = path is None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, equilibrium_expression):
+        return normalize_expression(equilibrium_expression) in self._entries
+
+    def get(self, equilibrium_expression):
+        """
+        Return the compiled system for an expression, compiling it on a miss.
+        """
+        if not self._loaded:
+            self._loaded = True
+            if os.path.exists(self.path):
+                self.load(self.path)
+
+        key = normalize_expression(equilibrium_expression)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = self._compile(key)
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            self._evict()
+        return compiled
+
+    def stats(self):
+        """
+        Return the hit, miss and eviction counters and the current size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def save(self, path=None):
+        """
+        Write the parsed systems to disk, least recently used first.
+
+        The compiled nonlinear systems hold generated functions that cannot
+        be pickled, so only the parsed EqSystem objects are stored; they
+        are recompiled cheaply on load.
+        """
+        path = path or self.path
+        with self._lock:
+            data = [(key, compiled.eqsys) for key, compiled in self._entries.items()]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file_object:
+            pickle.dump(data, file_object)
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        """
+        Read parsed systems written by save() into the cache.
+        """
+        # Imported here because equilibrium_sweep uses this module's cache.
+        from equilibrium_sweep import CompiledEquilibrium
+
+        path = path or self.path
+        try:
+            with open(path, "rb") as file_object:
+                data = pickle.load(file_object)
+        except Exception as e:
+            print(f"Could not load the equilibrium cache from {path}: {e}")
+            return
+        with self._lock:
+            for key, eqsys in data:
+                self._entries[key] = CompiledEquilibrium(key, eqsys=eqsys)
+                self._entries.move_to_end(key)
+            self._evict()
+
+    def _compile(self, key):
+        # Imported here because equilibrium_sweep uses this module's cache.
+        from equilibrium_sweep import CompiledEquilibrium
+
+        return CompiledEquilibrium(key)
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+default_cache = EquilibriumCache(path=os.environ.get("EQSYS_CACHE_PATH"))
+if default_cache.path is not None:
+    atexit.register(default_cache.save)
+
+
+def get_compiled_equilibrium(equilibrium_expression):
+    """
+    Return the compiled system for an expression from the default cache.
+    """
+    return default_cache.get(equilibrium_expression)
@@ -1,28 +1,25 @@
-from flask import Flask, request, render_template_string
+import argparse
+import json
+import os
+import threading
+import time
 
-app = Flask(__name__)
-
-
-@app.route("/", methods=["GET", "POST"])
-def equilibrium():
-    equilibrium_expr = None
-    reaction = None
+from flask import Flask, Response, g, jsonify, make_response, request, url_for
 
-    if request.method == "POST":
-        reaction = request.form["reaction"]
+import metrics
+from jobs import FINISHED, JobManager, QueueFull
+from response_cache import ResponseCache
 
-        # Parse the reaction and construct the equilibrium expression
-        reactants, products = reaction.split("->")
-        reactants = reactants.split("+")
-        products = products.split("+")
+app = Flask(__name__)
 
-        # Prepare the LaTeX formatted equilibrium expression
-        reactants_str = " * ".join([f"[{r.strip()}]" for r in reactants])
-        products_str = " * ".join([f"[{p.strip()}]" for p in products])
-        equilibrium_expr = f"K = \\frac{{ {products_str} }}{{ {reactants_str} }}"
+# Rendered pages keyed by the normalized reaction.
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get("RESPONSE_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", 600)),
+)
 
-    # HTML Template with MathJax
-    html_template = """
+# HTML Template with MathJax
+HTML_TEMPLATE = """
     <!doctype html>
     <html>
     <head>
@@ -38,6 +35,9 @@ def equilibrium():
             <input type="submit" value="Calculate">
         </form>
 
+        {% if error %}
+        <p style="color: red;">{{ error }}</p>
+        {% endif %}
         {% if equilibrium_expr %}
         <h3>Equilibrium Expression:</h3>
         <p>$$ {{ equilibrium_expr }} $$</p>
@@ -46,10 +46,323 @@ def equilibrium():
     </html>
     """
 
-    return render_template_string(
-        html_template, equilibrium_expr=equilibrium_expr, reaction=reaction
+# Compiled once at import instead of on every request.
+template = app.jinja_env.from_string(HTML_TEMPLATE)
+
+
+def parse_reaction_sides(reaction):
+    """
+    Splits a reaction such as "2A + 4B -> 3C + 10D" into its two sides.
+
+    Returns:
+    list of str: The reactants.
+    list of str: The products.
+    """
+    reactants, products = reaction.split("->")
+    reactants = [r.strip() for r in reactants.split("+")]
+    products = [p.strip() for p in products.split("+")]
+    return reactants, products
+
+
+def normalize_reaction(reaction):
+    """
+    Normalizes a reaction for use as a cache key, e.g. "2A+4B ->3C" becomes
+    "2A + 4B -> 3C".
+    """
+    reactants, products = parse_reaction_sides(reaction)
+    return f"{' + '.join(reactants)} -> {' + '.join(products)}"
+
+
+def build_equilibrium_expression(reactants, products):
+    """
+    Prepares the LaTeX formatted equilibrium expression.
+    """
+    reactants_str = " * ".join([f"[{r}]" for r in reactants])
+    products_str = " * ".join([f"[{p}]" for p in products])
+    return f"K = \\frac{{ {products_str} }}{{ {reactants_str} }}"
+
+
+def render_reaction(reaction):
+    """
+    Builds the equilibrium expression and the page for a normalized reaction.
+    """
+    with metrics.timer(
+        "chemistry_stage_seconds", operation="equilibrium_page", stage="parse"
+    ):
+        reactants, products = parse_reaction_sides(reaction)
+        equilibrium_expr = build_equilibrium_expression(reactants, products)
+    with metrics.timer(
+        "chemistry_stage_seconds", operation="equilibrium_page", stage="render"
+    ):
+        html = template.render(equilibrium_expr=equilibrium_expr, reaction=reaction)
+    return equilibrium_expr, html
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    # Unknown URLs share one label so scans cannot create endless series.
+    endpoint = request.endpoint or "unmatched"
+    start = g.get("request_start")
+    if (
+        metrics.REGISTRY.enabled
+        and start is not None
+        and endpoint != "metrics_endpoint"
+    ):
+        metrics.histogram("chemistry_request_seconds", endpoint=endpoint).observe(
+            time.perf_counter() - start
+        )
+        metrics.counter(
+            "chemistry_requests_total",
+            endpoint=endpoint,
+            status=response.status_code,
+        ).inc()
+    return response
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """
+    Metrics of this process in the Prometheus text format.
+    """
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/", methods=["GET", "POST"])
+def equilibrium():
+    # A reaction can also be given as ?reaction=..., so results can be
+    # bookmarked and revalidated with a conditional GET.
+    if request.method == "POST":
+        reaction = request.form["reaction"]
+    else:
+        reaction = request.args.get("reaction")
+    if not reaction:
+        return template.render(equilibrium_expr=None, reaction=None)
+
+    try:
+        key = normalize_reaction(reaction)
+    except ValueError as e:
+        metrics.count_error("equilibrium_page", e)
+        html = template.render(
+            equilibrium_expr=None,
+            reaction=reaction,
+            error="Expected a reaction of the form 'A + B -> C'",
+        )
+        return html, 400
+    entry = response_cache.get_or_render(key, lambda: render_reaction(key))
+
+    if request.method == "GET" and entry.etag in request.if_none_match:
+        response_cache.record_not_modified()
+        response = make_response("", 304)
+    else:
+        response = make_response(entry.html)
+    response.set_etag(entry.etag)
+    response.cache_control.max_age = int(response_cache.ttl)
+    return response
+
+
+@app.route("/api/cache-stats")
+def cache_stats():
+    """
+    Returns the response cache counters and hit rate as JSON.
+    """
+    return jsonify(response_cache.stats())
+
+
+@app.route("/api/equilibrium", methods=["GET", "POST"])
+def equilibrium_api():
+    """
+    JSON API: send {"reaction": "2A + 4B -> 3C + 10D"} (or ?reaction=...) and
+    get back the parsed sides and the LaTeX equilibrium expression.
+    """
+    if request.method == "POST":
+        data = request.get_json(silent=True) or request.form
+    else:
+        data = request.args
+    if not hasattr(data, "get"):
+        return jsonify(error="Expected a JSON object"), 400
+    reaction = data.get("reaction")
+    if not reaction:
+        return jsonify(error="Missing 'reaction'"), 400
+    if not isinstance(reaction, str):
+        return jsonify(error="'reaction' must be a string"), 400
+
+    try:
+        reactants, products = parse_reaction_sides(reaction)
+    except ValueError as e:
+        metrics.count_error("equilibrium_api", e)
+        return jsonify(error="Expected a reaction of the form 'A + B -> C'"), 400
+
+    return jsonify(
+        reaction=reaction,
+        reactants=reactants,
+        products=products,
+        equilibrium_expr=build_equilibrium_expression(reactants, products),
     )
 
 
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """
+    Returns this process's job manager, started on first use so that each
+    gunicorn worker gets its own runner threads after the fork.
+
+    Jobs live in the process that accepted them, which is why serve() runs
+    one gunicorn worker with several threads: polls, cancels and event
+    streams must reach the process that holds the job.
+    """
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager(
+                    workers=int(os.environ.get("JOB_WORKERS", 2)),
+                    queue_size=int(os.environ.get("JOB_QUEUE_SIZE", 100)),
+                    timeout=float(os.environ.get("JOB_TIMEOUT", 30)),
+                )
+    return _job_manager
+
+
+def job_response(job):
+    job = dict(job)
+    job.pop("version")
+    return job
+
+
+@app.route("/api/jobs", methods=["GET", "POST"])
+def jobs_api():
+    """
+    POST {"kind": "balance" | "equilibrium", "params": {...}, "timeout": s}
+    queues a job and returns 202 with its ID; GET returns queue statistics.
+    The timeout is capped at JOB_TIMEOUT; an invalid kind or timeout is a 400.
+    """
+    manager = get_job_manager()
+    if request.method == "GET":
+        return jsonify(manager.stats())
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict) or not isinstance(data.get("params", {}), dict):
+        return jsonify(error="Expected a JSON object with object 'params'"), 400
+    try:
+        job_id = manager.submit(
+            data.get("kind"), data.get("params") or {}, data.get("timeout")
+        )
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    except QueueFull:
+        response = jsonify(error="Too many jobs queued, try again later")
+        response.headers["Retry-After"] = "5"
+        return response, 429
+
+    response = jsonify(id=job_id, status_url=url_for("job_api", job_id=job_id))
+    response.headers["Location"] = url_for("job_api", job_id=job_id)
+    return response, 202
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET", "DELETE"])
+def job_api(job_id):
+    """
+    GET polls a job (?wait=seconds long-polls until it finishes); DELETE
+    cancels it.
+    """
+    manager = get_job_manager()
+    if request.method == "DELETE":
+        if not manager.cancel(job_id):
+            job = manager.status(job_id)
+            if job is None:
+                return jsonify(error="Unknown job"), 404
+            return jsonify(job_response(job)), 409
+        return jsonify(job_response(manager.status(job_id)))
+
+    wait = request.args.get("wait", type=float)
+    if wait:
+        job = manager.wait(job_id, timeout=min(wait, 60))
+    else:
+        job = manager.status(job_id)
+    if job is None:
+        return jsonify(error="Unknown job"), 404
+    return jsonify(job_response(job))
+
+
+@app.route("/api/jobs/<job_id>/events")
+def job_events(job_id):
+    """
+    Streams the job's status as server-sent events until it finishes.
+    """
+    manager = get_job_manager()
+    if manager.status(job_id) is None:
+        return jsonify(error="Unknown job"), 404
+
+    def stream():
+        version = None
+        while True:
+            job = manager.wait(job_id, timeout=15, since=version)
+            if job is None:
+                return
+            if job["version"] == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = job["version"]
+            yield f"data: {json.dumps(job_response(job))}\n\n"
+            if job["status"] in FINISHED:
+                return
+
+    return Response(stream(), mimetype="text/event-stream")
+
+
+def serve(host="127.0.0.1", port=8000, workers=1, threads=8):
+    """
+    Runs the app under gunicorn with threaded (gthread) workers.
+
+    The default is one process with several threads. Jobs, long polls and
+    event streams then share the process that owns the jobs, and a waiting
+    request holds one thread instead of the whole worker. The heavy work
+    runs in the job manager's worker processes anyway. More than one worker
+    only suits deployments that do not use the job API.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", threads)
+            self.cfg.set("accesslog", None)
+
+        def load(self):
+            return app
+
+    Server().run()
+
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description="Equilibrium expression web app.")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run under gunicorn instead of the Flask debug server.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Gunicorn processes; jobs are only visible in the one that "
+        "accepted them, so keep 1 when using the job API.",
+    )
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.host, args.port, args.workers, args.threads)
+    else:
+        app.run(debug=True)
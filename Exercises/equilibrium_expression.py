@@ -0,0 +1,133 @@
+"""
+Compiled equilibrium expressions.
+
+wk7.get_equilibrium_expression only builds a display string, and K was
+computed separately with Python loops. EquilibriumExpression keeps the
+parsed reaction as integer coefficient arrays and evaluates K (or log K,
+which does not overflow for large coefficients) for whole NumPy arrays of
+concentrations at once. The same object renders the expression for display.
+
+Example:
+    expression = EquilibriumExpression(*parse_reaction("2A + 4B -> 3C + 10D"))
+    print(expression)               # K = ([C]**3 * [D]**10) / ([A]**2 * [B]**4)
+    expression.log_K({"A": a, "B": b, "C": c, "D": d})
+"""
+
+import numpy as np
+
+
+class EquilibriumExpression:
+    """
+    The equilibrium expression K = prod(products) / prod(reactants).
+
+    Parameters:
+    reactants (dict): Reactant name -> coefficient, as from parse_reaction.
+    products (dict): Product name -> coefficient, as from parse_reaction.
+    """
+
+    def __init__(self, reactants, products):
+        self.reactants = list(reactants)
+        self.products = list(products)
+        self.species = self.reactants + self.products
+        self.reactant_coefficients = np.array(
+            [reactants[name] for name in self.reactants], dtype=np.int64
+        )
+        self.product_coefficients = np.array(
+            [products[name] for name in self.products], dtype=np.int64
+        )
+        # Signed coefficients in species order: negative for reactants.
+        self.nu = np.concatenate(
+            (-self.reactant_coefficients, self.product_coefficients)
+        )
+
+    def __repr__(self):
+        return f"EquilibriumExpression({self.string()!r})"
+
+    def __str__(self):
+        return self.string()
+
+    def string(self):
+        """
+        Returns the expression in the form used by wk7, e.g.
+        "K = ([C]**3 * [D]**10) / ([A]**2 * [B]**4)".
+        """
+        reactants_part = " * ".join(
+            [f"[{name}]**{coeff}" for name, coeff in self._reactant_items()]
+        )
+        products_part = " * ".join(
+            [f"[{name}]**{coeff}" for name, coeff in self._product_items()]
+        )
+        return f"K = ({products_part}) / ({reactants_part})"
+
+    def latex(self):
+        """
+        Returns the expression as LaTeX, e.g.
+        "K = \\frac{ [C]^{3} [D]^{10} }{ [A]^{2} [B]^{4} }".
+        """
+
+        def term(name, coeff):
+            return f"[{name}]" if coeff == 1 else f"[{name}]^{{{coeff}}}"
+
+        numerator = " ".join(term(n, c) for n, c in self._product_items())
+        denominator = " ".join(term(n, c) for n, c in self._reactant_items())
+        return f"K = \\frac{{ {numerator} }}{{ {denominator} }}"
+
+    def as_array(self, concentrations):
+        """
+        Stacks concentrations into an array of shape (n_species, ...).
+
+        Parameters:
+        concentrations (dict or array): Species name -> concentration
+        (scalar or array), or an array whose first axis follows self.species.
+        """
+        if isinstance(concentrations, dict):
+            columns = [np.asarray(concentrations[name], float) for name in self.species]
+            return np.stack(np.broadcast_arrays(*columns))
+        concentrations = np.asarray(concentrations, dtype=float)
+        if concentrations.shape[0] != len(self.species):
+            raise ValueError(
+                f"Expected {len(self.species)} species ({self.species}), "
+                f"got {concentrations.shape[0]}"
+            )
+        return concentrations
+
+    def log_K(self, concentrations):
+        """
+        Evaluates ln K = sum(nu * ln[c]) for arrays of concentrations.
+        """
+        c = self.as_array(concentrations)
+        nu = self.nu.reshape((-1,) + (1,) * (c.ndim - 1))
+        return np.sum(nu * np.log(c), axis=0)
+
+    def K(self, concentrations):
+        """
+        Evaluates K for arrays of concentrations.
+        """
+        return np.exp(self.log_K(concentrations))
+
+    def solve_for(self, name, K, concentrations):
+        """
+        Solves the expression for the concentration of one species.
+
+        Parameters:
+        name (str): The species to solve for.
+        K (float or array): The equilibrium constant.
+        concentrations (dict): The concentrations of all other species.
+
+        Returns:
+        numpy.ndarray: The concentration of the species.
+        """
+        index = self.species.index(name)
+        log_rest = np.log(np.asarray(K, dtype=float))
+        for other, coeff in zip(self.species, self.nu):
+            if other != name:
+                log_rest = log_rest - coeff * np.log(
+                    np.asarray(concentrations[other], float)
+                )
+        return np.exp(log_rest / self.nu[index])
+
+    def _reactant_items(self):
+        return zip(self.reactants, self.reactant_coefficients.tolist())
+
+    def _product_items(self):
+        return zip(self.products, self.product_coefficients.tolist())
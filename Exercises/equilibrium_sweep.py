@@ -0,0 +1,154 @@
+"""
+Batched equilibrium solving for parameter sweeps.
+
+calculate_equilibrium_and_ph in console_testv5.py builds a new EqSystem and
+a new symbolic nonlinear system for every call. For titration curves and
+buffer-design sweeps the reaction never changes, only the initial
+concentrations do, so CompiledEquilibrium parses the expression and builds
+the nonlinear system once and reuses it for every row.
+
+Example:
+    eq = CompiledEquilibrium("HC2H3O2 = H+ + C2H3O2-; 1.8*10**-5")
+    init = np.column_stack([np.full(50, 0.1), np.full(50, 1e-7),
+                            np.linspace(0.0, 0.2, 50)])
+    conc, pH = eq.sweep(init, columns=["HC2H3O2", "H+", "C2H3O2-"])
+"""
+
+import warnings
+from math import log10
+
+import numpy as np
+from chempy.equilibria import EqSystem, NumSysLog
+
+from eqsys_cache import get_compiled_equilibrium
+
+NEQSYS_TYPE = "chained_conditional"
+
+
+class CompiledEquilibrium:
+    """
+    An equilibrium expression parsed and compiled once for repeated solving.
+
+    Parameters:
+    equilibrium_expression (str): The equilibrium expression in the format
+    'A = B + C; K', e.g. 'HC2H3O2 = H+ + C2H3O2-; 1.8*10**-5'.
+    eqsys (EqSystem): An already parsed system for the expression, e.g. one
+    loaded from the on-disk cache in eqsys_cache.py.
+    """
+
+    def __init__(self, equilibrium_expression, eqsys=None):
+        self.equilibrium_expression = equilibrium_expression
+        if eqsys is None:
+            eqsys = EqSystem.from_string(equilibrium_expression)
+        self.eqsys = eqsys
+        self.substances = list(self.eqsys.substances)
+        self.neqsys = self.eqsys.get_neqsys(NEQSYS_TYPE, NumSys=NumSysLog)
+        if "H+" in self.substances:
+            self.h_index = self.substances.index("H+")
+        else:
+            self.h_index = None
+
+    def __repr__(self):
+        return f"CompiledEquilibrium({self.equilibrium_expression!r})"
+
+    def ph(self, concentrations):
+        """
+        Calculates pH from equilibrium concentrations (pH 7 if there is no H+).
+        """
+        concentrations = np.asarray(concentrations, dtype=float)
+        if self.h_index is None:
+            return np.full(concentrations.shape[:-1], -log10(1e-7))
+        return -np.log10(concentrations[..., self.h_index])
+
+    def solve(self, initial_concentrations, x0=None):
+        """
+        Solves one set of initial concentrations.
+
+        Parameters:
+        initial_concentrations (dict or array): Initial concentrations.
+        x0 (array): Optional starting guess, e.g. a neighbouring solution.
+
+        Returns:
+        dict: The equilibrium concentrations of all species.
+        float: The pH of the solution.
+        float: The H+ concentration at equilibrium.
+        """
+        arr, _, _ = self.eqsys.root(initial_concentrations, x0=x0, neqsys=self.neqsys)
+        conc = dict(zip(self.substances, arr))
+        h_concentration = conc.get("H+", 1e-7)
+        return conc, -log10(h_concentration), h_concentration
+
+    def sweep(self, initial_conditions, columns=None, warm_start=True):
+        """
+        Solves every row of a 2-D array of initial concentrations.
+
+        Parameters:
+        initial_conditions (array): Shape (n_rows, n_species), one set of
+        initial concentrations per row.
+        columns (list of str): The species of each column. Defaults to
+        self.substances; species not listed start at 0.
+        warm_start (bool): Start each row from the previous row's solution
+        instead of from its initial concentrations.
+
+        Returns:
+        numpy.ndarray: Shape (n_rows, len(self.substances)), the equilibrium
+        concentrations in the order of self.substances.
+        numpy.ndarray: Shape (n_rows,), the pH of each row.
+        """
+        initial_conditions = np.atleast_2d(np.asarray(initial_conditions, float))
+        if columns is not None:
+            init = np.zeros((len(initial_conditions), len(self.substances)))
+            for col, name in enumerate(columns):
+                init[:, self.substances.index(name)] = initial_conditions[:, col]
+        else:
+            init = initial_conditions
+        if init.shape[1] != len(self.substances):
+            raise ValueError(
+                f"Expected {len(self.substances)} columns ({self.substances}), "
+                f"got {init.shape[1]}"
+            )
+
+        params_tail = [float(k) for k in self.eqsys.eq_constants()]
+        concentrations = np.empty_like(init)
+        x0 = None
+        for row, init_concs in enumerate(init):
+            guess = init_concs if x0 is None or not warm_start else x0
+            x, sol = self.neqsys.solve(guess, np.concatenate((init_concs, params_tail)))
+            if not sol["success"]:
+                warnings.warn(
+                    f"Root finding indicated as failed by solver (row {row})."
+                )
+                x0 = None
+            else:
+                x0 = x
+            concentrations[row] = x
+
+        return concentrations, self.ph(concentrations)
+
+
+def sweep_equilibrium_and_ph(initial_conditions, equilibrium_expression, columns=None):
+    """
+    Batched counterpart of calculate_equilibrium_and_ph.
+
+    Parameters:
+    initial_conditions (array): Shape (n_rows, n_species) initial concentrations.
+    equilibrium_expression (str): The equilibrium expression in the format 'A = B + C; K'.
+    columns (list of str): The species of each column of initial_conditions.
+
+    Returns:
+    list of str: The species order of the concentration columns.
+    numpy.ndarray: The equilibrium concentrations, one row per input row.
+    numpy.ndarray: The pH of each row.
+    """
+    compiled = get_compiled_equilibrium(equilibrium_expression)
+    concentrations, ph = compiled.sweep(initial_conditions, columns=columns)
+    return compiled.substances, concentrations, ph
+
+
+if __name__ == "__main__":
+    compiled = CompiledEquilibrium("HC2H3O2 = H+ + C2H3O2-; 1.8*10**-5")
+    acetate = np.linspace(0.0, 0.2, 5)
+    init = np.column_stack([np.full(5, 0.1), np.full(5, 1e-7), acetate])
+    conc, ph = compiled.sweep(init, columns=["HC2H3O2", "H+", "C2H3O2-"])
+    for c0, value in zip(acetate, ph):
+        print(f"[C2H3O2-]0 = {c0:.3f} M -> pH {value:.3f}")
@@ -0,0 +1,219 @@
+import re
+
+import numpy as np
+
+from periodic_table import ATOMIC_NUMBERS, SYMBOLS
+
+# Hand-written replacement for chempy's pyparsing grammar in
+# chempy.util.parsing.formula_to_composition. The accepted syntax and the
+# returned compositions are the same:
+#
+#   term     :: (element | '(' formula ')' | '[' formula ']' | '{' formula '}'
+#                | '@' formula) count state? primes?
+#   formula  :: term+
+#   hydrate  :: ('..' | '·') integer? formula
+#   compound :: prefix? formula hydrate* charge? suffix?
+#
+# Compositions map atomic number -> count, with key 0 holding the net charge.
+
+# Elements 1-118, official symbols (same alternation order as chempy so that
+# e.g. "Co" is cobalt and "CO" is carbon + oxygen).
+_ELEMENT = (
+    r"A[cglmrstu]|B[aehikr]?|C[adeflmnorsu]?|D[bsy]|E[rsu]|F[elmr]?|G[ade]"
+    r"|H[efgos]?|I[nr]?|Kr?|L[airuv]|M[cdgnot]|N[abdehiop]?|O[gs]?"
+    r"|P[abdmortu]?|R[abefghnu]|S[bcegimnr]?|T[abcehilms]|U|V|W|Xe|Yb?|Z[nr]"
+)
+_TAIL = r"(\d+\.\d+|\d*)(?:\((?:s|l|g|aq|cr)\))?(?:[*']+)?"
+
+_element_term = re.compile(r"(%s)%s" % (_ELEMENT, _TAIL))
+_group_close = re.compile(r"([)\]}])%s" % _TAIL)
+_leading_integer = re.compile(r"\d+")
+
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+
+_GREEK_LETTERS = (
+    "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu nu xi"
+    " omicron pi rho sigma tau upsilon phi chi psi omega"
+).split()
+PREFIXES = tuple(letter + "-" for letter in _GREEK_LETTERS) + (".",)
+SUFFIXES = ("(s)", "(l)", "(g)", "(aq)")
+
+N_COLUMNS = len(SYMBOLS) + 1
+
+
+def _count(text):
+    return 1 if text == "" else float(text)
+
+
+def _merge(target, source, mult):
+    for key, value in source.items():
+        target[key] = target.get(key, 0) + value * mult
+
+
+def _parse_stoich(stoich):
+    """
+    Parse the neutral part of a formula (no charge, hydrate or phase).
+    """
+    # Special case: the electron is not an element.
+    if stoich == "e":
+        return {}
+
+    stoich = "".join(stoich.split())
+    # Each frame is [counts, expected closer]; '@' (caged) frames have no
+    # closer and end where their enclosing group ends.
+    stack = [[{}, None]]
+    pos, end = 0, len(stoich)
+
+    while True:
+        if pos < end:
+            char = stoich[pos]
+        else:
+            char = ""
+
+        if char in _OPENERS:
+            stack.append([{}, _OPENERS[char]])
+            pos += 1
+            continue
+        if char == "@":
+            stack.append([{}, "@"])
+            pos += 1
+            continue
+
+        if char == "" or char in ")]}":
+            while stack[-1][1] == "@":
+                counts = stack.pop()[0]
+                if not counts:
+                    raise ValueError("Empty group in formula: %s" % stoich)
+                _merge(stack[-1][0], counts, 1)
+            if char == "":
+                break
+            match = _group_close.match(stoich, pos)
+            counts, closer = stack.pop() if len(stack) > 1 else ({}, None)
+            if closer != char or not counts:
+                raise ValueError("Unbalanced brackets in formula: %s" % stoich)
+            _merge(stack[-1][0], counts, _count(match.group(2)))
+            pos = match.end()
+            continue
+
+        match = _element_term.match(stoich, pos)
+        if match is None:
+            raise ValueError("Failed to parse formula: %s" % stoich)
+        symbol, count = match.groups()
+        key = ATOMIC_NUMBERS[symbol]
+        counts = stack[-1][0]
+        counts[key] = counts.get(key, 0) + _count(count)
+        pos = match.end()
+
+    if len(stack) != 1 or not stack[0][0]:
+        raise ValueError("Failed to parse formula: %s" % stoich)
+
+    # Only keep non-integer subscripts where they are really needed.
+    return {k: int(v) if v == int(v) else v for k, v in stack[0][0].items()}
+
+
+def _get_charge(chgstr):
+    if chgstr == "+":
+        return 1
+    elif chgstr == "-":
+        return -1
+
+    for token, anti, sign in zip("+-", "-+", (1, -1)):
+        if token in chgstr:
+            if anti in chgstr:
+                raise ValueError("Invalid charge description (+ & - present)")
+
+            before, after = chgstr.split(token)
+
+            if len(before) > 0 and len(after) > 0:
+                raise ValueError("Values both before and after charge token")
+
+            if len(after) > 0:
+                return sign * int(after)
+
+    raise ValueError("Invalid charge description (+ or - missing)")
+
+
+def split_formula(formula, prefixes=PREFIXES, suffixes=SUFFIXES):
+    """
+    Split a formula into its stoichiometric part and its charge.
+
+    Parameters:
+    formula (str): A chemical formula, e.g. 'Fe(CN)6-3' or 'NaCl(s)'.
+
+    Returns:
+    str: The formula with prefixes, phase suffix and charge removed.
+    str or None: The charge part, e.g. '-3', or None for neutral species.
+    """
+    for prefix in prefixes:
+        if formula.startswith(prefix):
+            formula = formula[len(prefix) :]
+    for suffix in suffixes:
+        if formula.endswith(suffix):
+            formula = formula[: -len(suffix)]
+
+    if "/" in formula:
+        raise ValueError(
+            "Slashes ('/') in charge strings are deprecated."
+            "  Use `Fe+3` instead of `Fe/3+`."
+        )
+    for token in "+-":
+        if token in formula:
+            if formula.count(token) > 1:
+                raise ValueError("Multiple tokens: %s" % token)
+            stoich, charge = formula.split(token)
+            return stoich, token + charge
+    return formula, None
+
+
+def formula_to_composition(formula, prefixes=PREFIXES, suffixes=SUFFIXES):
+    """
+    Parse a chemical formula into an element-count dictionary.
+
+    Handles nested parentheses ('Ca3(PO4)2'), hydrates ('CuSO4·5H2O' or
+    'CuSO4..5H2O'), charges ('Fe(CN)6-3') and phase suffixes ('NaCl(s)').
+    The result matches chempy.util.parsing.formula_to_composition.
+
+    Parameters:
+    formula (str): The chemical formula, e.g. 'NH4+'.
+
+    Returns:
+    dict: Atomic number -> count; key 0 holds the net charge.
+    """
+    stoich, charge = split_formula(formula, prefixes, suffixes)
+
+    if "·" in stoich:
+        parts = stoich.split("·")
+    else:
+        parts = stoich.split("..")
+
+    composition = _parse_stoich(parts[0])
+    for part in parts[1:]:
+        match = _leading_integer.match(part)
+        if match:
+            _merge(composition, _parse_stoich(part[match.end() :]), int(match.group()))
+        else:
+            _merge(composition, _parse_stoich(part), 1)
+
+    if charge is not None:
+        composition[0] = _get_charge(charge)
+
+    return composition
+
+
+def formula_to_array(formula):
+    """
+    Parse a chemical formula into a dense element-count array.
+
+    Returns:
+    numpy.ndarray: Length 119 array indexed by atomic number; index 0 holds
+    the net charge.
+    """
+    counts = np.zeros(N_COLUMNS)
+    for key, value in formula_to_composition(formula).items():
+        counts[key] = value
+    return counts
+
+
+if __name__ == "__main__":
+    for example in ["H2O", "Fe(CN)6-3", "CuSO4·5H2O", "NaCl(s)", "K4[Fe(CN)6]"]:
+        print(example, formula_to_composition(example))
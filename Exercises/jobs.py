@@ -0,0 +1,371 @@
+"""
+Background jobs for long equilibrium and balancing computations.
+
+A large EqSystem.root solve or balance can take seconds, which blocks a web
+worker. JobManager takes the work off the request: submit() returns a job
+ID straight away, the job waits in a bounded in-process queue, and a fixed
+number of runner threads each hand one job at a time to their own worker
+process. Workers are long-lived: they import chempy and the calculators
+once when they start, and keep the compiled-equilibrium cache between
+jobs. Running jobs in a separate process is what makes per-job timeouts
+and cancellation real: the worker is terminated, not just abandoned, and a
+fresh one takes its place. When the queue is full, submit() raises
+QueueFull so callers can push back (the web app answers 429).
+
+Example:
+    manager = JobManager(workers=2)
+    job_id = manager.submit("balance", {"reaction": "H2 + O2 -> H2O"})
+    manager.wait(job_id)["result"]
+"""
+
+import importlib
+import itertools
+import math
+import multiprocessing
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from queue import Full as QueueFull
+
+QUEUE_SIZE = 100
+HISTORY_SIZE = 1000
+TIMEOUT = 30.0
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED, TIMED_OUT = (
+    "queued",
+    "running",
+    "done",
+    "failed",
+    "cancelled",
+    "timeout",
+)
+FINISHED = {DONE, FAILED, CANCELLED, TIMED_OUT}
+
+
+def run_balance(params):
+    """
+    Job: balance {"reaction": "H2 + O2 -> H2O"}.
+    """
+    from balancer import balance_stoichiometry
+    from console_testv5 import format_chemical_equation, parse_chemical_equation
+
+    reactants, products = parse_chemical_equation(params["reaction"])
+    reactants, products = balance_stoichiometry(reactants, products)
+    return {"balanced": format_chemical_equation(reactants, products)}
+
+
+def run_equilibrium(params):
+    """
+    Job: solve {"expression": "A = B + C; K", "initial": {"A": 0.1, ...}}.
+    """
+    from collections import defaultdict
+
+    from console_testv5 import calculate_equilibrium_and_ph
+
+    initial = defaultdict(float, params.get("initial", {}))
+    conc, pH, h_concentration = calculate_equilibrium_and_ph(
+        initial, params["expression"]
+    )
+    return {
+        "concentrations": {name: float(value) for name, value in conc.items()},
+        "pH": float(pH),
+        "h_concentration": float(h_concentration),
+    }
+
+
+JOB_TYPES = {
+    "balance": run_balance,
+    "equilibrium": run_equilibrium,
+}
+
+# Imported by every worker when it starts, before its first job.
+WARM_MODULES = ["chempy", "balancer", "eqsys_cache", "console_testv5"]
+
+
+def _worker_main(connection, module_names):
+    # Runs in a worker process: receives (kind, params) until it gets None
+    # and sends back ("ok", result) or ("error", message) for each job.
+    for name in module_names:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass  # the job that needs it reports the error
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        kind, params = message
+        try:
+            outcome = ("ok", JOB_TYPES[kind](params))
+        except Exception as e:
+            outcome = ("error", f"{type(e).__name__}: {e}")
+        connection.send(outcome)
+
+
+class _Worker:
+    """
+    A long-lived process that runs one job at a time for a runner thread.
+    """
+
+    def __init__(self, context):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child, WARM_MODULES), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def run(self, kind, params, timeout):
+        """
+        Returns ("ok", result) or ("error", message) from the job, or
+        (TIMED_OUT, None) or (FAILED, exit code) if the worker has to be
+        replaced.
+        """
+        self.connection.send((kind, params))
+        if not self.connection.poll(timeout):
+            return TIMED_OUT, None
+        try:
+            return self.connection.recv()
+        except EOFError:
+            self.process.join()
+            return FAILED, self.process.exitcode
+
+    def terminate(self):
+        self.process.terminate()
+
+    def close(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+class JobManager:
+    """
+    Bounded queue of jobs run by a fixed pool of worker processes.
+
+    Parameters:
+    workers (int): How many jobs run at once.
+    queue_size (int): How many jobs may wait; submit() raises QueueFull
+    beyond that.
+    timeout (float): Default seconds a job may run before it is killed.
+    history_size (int): How many finished jobs are kept for polling.
+    """
+
+    def __init__(
+        self,
+        workers=2,
+        queue_size=QUEUE_SIZE,
+        timeout=TIMEOUT,
+        history_size=HISTORY_SIZE,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.history_size = history_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._workers = {}
+        self._condition = threading.Condition()
+        # Workers are not forked from this process, which may be a
+        # multithreaded web worker.
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        self._counter = itertools.count()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-runner-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, kind, params, timeout=None):
+        """
+        Queues a job and returns its ID.
+
+        Parameters:
+        kind (str): A key of JOB_TYPES.
+        params (dict): The job's input.
+        timeout (float): Seconds the job may run, at most the manager
+        default; the manager default if None.
+
+        Raises:
+        ValueError: If kind is unknown or timeout is not a positive number.
+        QueueFull: If too many jobs are already waiting.
+        """
+        if not isinstance(kind, str) or kind not in JOB_TYPES:
+            raise ValueError(
+                f"Unknown job type {kind!r}; expected one of {sorted(JOB_TYPES)}"
+            )
+        if timeout is None:
+            timeout = self.timeout
+        else:
+            try:
+                timeout = float(timeout)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid timeout {timeout!r}") from None
+            if not math.isfinite(timeout) or timeout <= 0:
+                raise ValueError(f"Timeout must be positive, got {timeout!r}")
+            timeout = min(timeout, self.timeout)
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "params": params,
+            "status": QUEUED,
+            "timeout": timeout,
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "result": None,
+            "error": None,
+            "version": next(self._counter),
+        }
+        with self._condition:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait(job_id)
+        except QueueFull:
+            with self._condition:
+                del self._jobs[job_id]
+            raise
+        return job_id
+
+    def status(self, job_id):
+        """
+        Returns a copy of the job's record, or None if it is unknown.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def wait(self, job_id, timeout=None, since=None):
+        """
+        Blocks until the job finishes, or until it changes after version
+        `since`, or until timeout seconds pass; returns its record.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                if job["status"] in FINISHED or (
+                    since is not None and job["version"] > since
+                ):
+                    return dict(job)
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return dict(job)
+                self._condition.wait(remaining)
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued job, or terminates a running one.
+
+        Returns:
+        bool: True if the job was cancelled, False if it had already
+        finished or is unknown.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in FINISHED:
+                return False
+            worker = self._workers.get(job_id)
+            self._finish(job, CANCELLED, error="Cancelled")
+        if worker is not None:
+            worker.terminate()
+        return True
+
+    def stats(self):
+        with self._condition:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "jobs": counts,
+        }
+
+    def _finish(self, job, status, result=None, error=None):
+        # Called with the condition held.
+        job.update(
+            status=status,
+            result=result,
+            error=error,
+            finished=time.time(),
+            version=next(self._counter),
+        )
+        self._condition.notify_all()
+        finished = [j for j, v in self._jobs.items() if v["status"] in FINISHED]
+        for old in finished[: max(0, len(finished) - self.history_size)]:
+            del self._jobs[old]
+
+    def _run(self):
+        try:
+            worker = _Worker(self._context)  # warms up before the first job
+        except Exception:
+            worker = None
+        while True:
+            job_id = self._queue.get()
+            try:
+                worker = self._run_job(job_id, worker)
+            except Exception as e:
+                # Whatever went wrong, fail this job and keep the runner.
+                with self._condition:
+                    job = self._jobs.get(job_id)
+                    if job is not None and job["status"] not in FINISHED:
+                        self._finish(job, FAILED, error=f"{type(e).__name__}: {e}")
+                if worker is not None:
+                    worker.close()
+                worker = None
+
+    def _run_job(self, job_id, worker):
+        # Runs one job on worker, starting a worker first if needed, and
+        # returns the worker to use for the next job.
+        if worker is None:
+            worker = _Worker(self._context)
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                return worker
+            job.update(status=RUNNING, started=time.time(), version=next(self._counter))
+            self._workers[job_id] = worker
+            self._condition.notify_all()
+        try:
+            outcome = worker.run(job["kind"], job["params"], job["timeout"])
+            replace = outcome[0] in (TIMED_OUT, FAILED)
+        except Exception as e:
+            # E.g. params that cannot be pickled; the worker's state is
+            # unknown, so it is replaced.
+            outcome = ("error", f"{type(e).__name__}: {e}")
+            replace = True
+        with self._condition:
+            self._workers.pop(job_id, None)
+            replace = replace or job["status"] == CANCELLED
+            self._record(job, outcome)
+        if replace or not worker.process.is_alive():
+            worker.close()
+            worker = _Worker(self._context)
+        return worker
+
+    def _record(self, job, outcome):
+        # Called with the condition held.
+        if job["status"] != RUNNING:
+            return  # cancelled meanwhile
+        kind, value = outcome
+        if kind == TIMED_OUT:
+            self._finish(job, TIMED_OUT, error=f"Timed out after {job['timeout']} s")
+        elif kind == FAILED:
+            self._finish(job, FAILED, error=f"Worker exited with code {value}")
+        elif kind == "ok":
+            self._finish(job, DONE, result=value)
+        else:
+            self._finish(job, FAILED, error=value)
@@ -0,0 +1,238 @@
+"""
+Mass-action kinetics for reaction networks written like wk7's reactions.
+
+Each reaction "2A + B -> C" is parsed with wk7.parse_reaction and has the
+rate r = k [A]**2 [B]. KineticsModel turns a network into a padded table
+of reactant indices and orders plus a net stoichiometry matrix, so the
+rates, d[c]/dt and the analytic Jacobian are evaluated for a whole batch of
+states and rate constants with a few array operations.
+
+simulate() integrates a batch with SciPy's stiff BDF solver. All parameter
+sets in a chunk are one ODE system whose Jacobian is block diagonal, one
+block per set, passed to the solver as a sparse BSR matrix; the solver
+then factorizes the blocks instead of a dense matrix, so thousands of sets
+for a fit or a sensitivity study are solved together.
+
+Example:
+    model = KineticsModel(["A -> B", "2B -> B + C", "B + C -> A + C"])
+    result = model.simulate({"A": 1.0}, [0.04, 3e7, 1e4], [0, 1, 10, 100])
+    result.concentrations[0, -1]    # set 0 at t = 100
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+from scipy.integrate import solve_ivp
+
+from wk7 import parse_reaction
+
+KineticsResult = namedtuple(
+    "KineticsResult", "species t concentrations success nfev njev elapsed"
+)
+
+
+class KineticsModel:
+    """
+    A mass-action reaction network.
+
+    Parameters:
+    reactions (list of str): Irreversible reactions such as "2A + B -> C";
+    write a reversible reaction as two.
+    """
+
+    def __init__(self, reactions):
+        parsed = [parse_reaction(reaction) for reaction in reactions]
+        names = {}
+        for reactants, products in parsed:
+            for name in list(reactants) + list(products):
+                names.setdefault(name, len(names))
+        self.reactions = list(reactions)
+        self.species = list(names)
+        n_species, n_reactions = len(names), len(parsed)
+
+        # Reactants padded to the longest reaction; padding has order 0.
+        width = max([len(reactants) for reactants, _ in parsed] + [1])
+        self.reactant_index = np.zeros((n_reactions, width), dtype=np.intp)
+        self.reactant_order = np.zeros((n_reactions, width))
+        self.stoichiometry = np.zeros((n_species, n_reactions))
+        for j, (reactants, products) in enumerate(parsed):
+            for p, (name, coefficient) in enumerate(reactants.items()):
+                self.reactant_index[j, p] = names[name]
+                self.reactant_order[j, p] = coefficient
+                self.stoichiometry[names[name], j] -= coefficient
+            for name, coefficient in products.items():
+                self.stoichiometry[names[name], j] += coefficient
+
+    def __repr__(self):
+        return f"KineticsModel({self.reactions!r})"
+
+    def _batch(self, concentrations, rate_constants):
+        c = np.atleast_2d(np.asarray(concentrations, dtype=float))
+        k = np.atleast_2d(np.asarray(rate_constants, dtype=float))
+        if c.shape[-1] != len(self.species):
+            raise ValueError(
+                f"Expected {len(self.species)} concentrations ({self.species}), "
+                f"got {c.shape[-1]}"
+            )
+        if k.shape[-1] != len(self.reactions):
+            raise ValueError(
+                f"Expected {len(self.reactions)} rate constants, got {k.shape[-1]}"
+            )
+        batch = np.broadcast_shapes(c.shape[:-1], k.shape[:-1])
+        return (
+            np.broadcast_to(c, batch + c.shape[-1:]),
+            np.broadcast_to(k, batch + k.shape[-1:]),
+        )
+
+    def concentration_array(self, concentrations):
+        """
+        Turns a {species: concentration} dict into an array in species order;
+        species left out start at 0. Arrays are returned unchanged.
+        """
+        if isinstance(concentrations, dict):
+            unknown = set(concentrations) - set(self.species)
+            if unknown:
+                raise ValueError(f"Unknown species {sorted(unknown)}")
+            return np.array([concentrations.get(s, 0.0) for s in self.species])
+        return np.asarray(concentrations, dtype=float)
+
+    def _terms(self, c):
+        # c[b, reactant_index]**order, shape (batch, reactions, width).
+        return c[:, self.reactant_index] ** self.reactant_order
+
+    def rates(self, concentrations, rate_constants):
+        """
+        The rate of every reaction, shape (batch, reactions).
+        """
+        c, k = self._batch(concentrations, rate_constants)
+        return k * self._terms(c).prod(axis=2)
+
+    def rhs(self, concentrations, rate_constants):
+        """
+        d[c]/dt for every set, shape (batch, species).
+        """
+        return self.rates(concentrations, rate_constants) @ self.stoichiometry.T
+
+    def jacobian(self, concentrations, rate_constants):
+        """
+        The analytic Jacobian d(d[c]/dt)/d[c], shape (batch, species, species).
+        """
+        c, k = self._batch(concentrations, rate_constants)
+        terms = self._terms(c)
+        batch, n_reactions, width = terms.shape
+        # d rate_j / d c_i for each reactant slot p of reaction j.
+        derivative = np.zeros((batch, n_reactions, len(self.species)))
+        for p in range(width):
+            order = self.reactant_order[:, p]
+            index = self.reactant_index[:, p]
+            others = np.delete(terms, p, axis=2).prod(axis=2)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                power = np.where(order > 0, c[:, index] ** (order - 1), 0.0)
+            slot = k * order * power * others
+            rows = np.arange(n_reactions)
+            np.add.at(derivative, (slice(None), rows, index), slot)
+        return np.einsum("sj,bji->bsi", self.stoichiometry, derivative)
+
+    def simulate(
+        self,
+        initial,
+        rate_constants,
+        t_eval,
+        rtol=1e-6,
+        atol=1e-12,
+        chunk_size=1000,
+    ):
+        """
+        Integrates a batch of parameter sets with a stiff solver.
+
+        Parameters:
+        initial (dict or array): Initial concentrations, as a dict, an
+        array in species order, or shape (batch, species).
+        rate_constants (array): Shape (reactions,) or (batch, reactions).
+        t_eval (array): Output times, starting at the initial time.
+        rtol, atol (float): Solver tolerances.
+        chunk_size (int): Parameter sets integrated as one system.
+
+        Returns:
+        KineticsResult: species, t, concentrations of shape (batch,
+        len(t), species), whether every chunk succeeded, the total
+        right-hand side and Jacobian evaluations, and the time taken.
+        """
+        start = time.perf_counter()
+        c0, k = self._batch(self.concentration_array(initial), rate_constants)
+        t_eval = np.asarray(t_eval, dtype=float)
+        n_species = len(self.species)
+        out = np.empty((len(c0), len(t_eval), n_species))
+        success, nfev, njev = True, 0, 0
+
+        for first in range(0, len(c0), chunk_size):
+            k_chunk = k[first : first + chunk_size]
+            size = len(k_chunk)
+            blocks = np.arange(size)
+
+            def fun(t, y):
+                return self.rhs(y.reshape(size, n_species), k_chunk).ravel()
+
+            def jac(t, y):
+                J = self.jacobian(y.reshape(size, n_species), k_chunk)
+                return sparse.bsr_matrix(
+                    (J, blocks, np.arange(size + 1)),
+                    shape=(size * n_species, size * n_species),
+                )
+
+            solution = solve_ivp(
+                fun,
+                (t_eval[0], t_eval[-1]),
+                c0[first : first + chunk_size].ravel(),
+                method="BDF",
+                t_eval=t_eval,
+                jac=jac,
+                rtol=rtol,
+                atol=atol,
+            )
+            success &= bool(solution.success)
+            nfev += solution.nfev
+            njev += solution.njev
+            y = solution.y.reshape(size, n_species, -1)
+            out[first : first + size, : y.shape[2]] = y.transpose(0, 2, 1)
+            out[first : first + size, y.shape[2] :] = np.nan
+
+        return KineticsResult(
+            self.species,
+            t_eval,
+            out,
+            success,
+            nfev,
+            njev,
+            time.perf_counter() - start,
+        )
+
+
+if __name__ == "__main__":
+    # Robertson's stiff chemical kinetics problem.
+    model = KineticsModel(["A -> B", "2B -> B + C", "B + C -> A + C"])
+    result = model.simulate({"A": 1.0}, [0.04, 3e7, 1e4], np.logspace(-5, 5, 11))
+    print(model)
+    for t, c in zip(result.t, result.concentrations[0]):
+        print(
+            f"t = {t:8.0e}: "
+            + ", ".join(f"[{s}] = {v:.4e}" for s, v in zip(model.species, c))
+        )
+
+    # A -> B -> C for 5,000 pairs of rate constants at once.
+    model = KineticsModel(["A -> B", "B -> C"])
+    rng = np.random.default_rng(0)
+    k = rng.uniform(0.1, 10, (5000, 2))
+    t = np.linspace(0, 5, 51)
+    result = model.simulate({"A": 1.0}, k, t)
+    k1, k2 = k[:, :1], k[:, 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact_b = k1 / (k2 - k1) * (np.exp(-k1 * t) - np.exp(-k2 * t))
+    error = np.nanmax(np.abs(result.concentrations[:, :, 1] - exact_b))
+    print(
+        f"{len(k):,} parameter sets in {result.elapsed:.2f} s "
+        f"({result.nfev} RHS and {result.njev} Jacobian evaluations); "
+        f"largest error in [B]: {error:.1e}"
+    )
@@ -0,0 +1,231 @@
+"""
+Disk-backed memo of calculator results shared by all sessions.
+
+Molar masses, balanced equations and equilibria for common reagents are
+asked for over and over, so console_testv5 keeps their results in a SQLite
+file keyed by operation and normalized input. Several calculators can use
+the same file at once (WAL mode with a busy timeout), the least recently
+used entries are dropped once the store grows past max_entries, and every
+entry is tied to a hash of the atomic-weight table and the chempy version
+(chempy's own table gives the memoized molar masses): when either changes,
+the old results are discarded on the next open.
+
+One connection is shared by all threads of a process (the Flask and
+gunicorn threads use the same store), so every use of it holds a lock.
+
+Set CHEMISTRY_MEMO_PATH to move the file, or to an empty string to turn
+memoization off.
+"""
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from periodic_table import ELECTRON_MASS, RELATIVE_ATOMIC_MASSES
+
+MEMO_PATH = "calculator_memo.sqlite3"
+MAX_ENTRIES = 100_000
+# Bump when the stored value format changes.
+FORMAT_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    operation TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (operation, key)
+);
+CREATE INDEX IF NOT EXISTS memo_last_used ON memo (last_used);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _chempy_version():
+    # Read from the package metadata, so opening the store does not import
+    # chempy.
+    try:
+        return importlib.metadata.version("chempy")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def table_version():
+    """
+    Returns a hash of the atomic-weight tables and the value format.
+    """
+    data = repr(
+        (FORMAT_VERSION, ELECTRON_MASS, RELATIVE_ATOMIC_MASSES, _chempy_version())
+    )
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+class MemoStore:
+    """
+    SQLite memo of (operation, key) -> JSON value with LRU eviction.
+
+    Parameters:
+    path (str): The database file; created if it does not exist.
+    max_entries (int): The number of entries kept after an eviction pass.
+    version (str): Entries written under another version are discarded.
+    """
+
+    def __init__(self, path=MEMO_PATH, max_entries=MAX_ENTRIES, version=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version or table_version()
+        self.hits = self.misses = 0
+        self._writes = 0
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(
+            path, timeout=10, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._check_version()
+
+    def _check_version(self):
+        # BEGIN IMMEDIATE so only one process clears a stale store.
+        with self._lock:
+            self._check_version_locked()
+
+    def _check_version_locked(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.connection.execute(
+                "SELECT value FROM meta WHERE key = 'version'"
+            ).fetchone()
+            if row is None or row[0] != self.version:
+                self.connection.execute("DELETE FROM memo")
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                    (self.version,),
+                )
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+
+    def get(self, operation, key):
+        """
+        Returns the stored value, or None if there is none.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value FROM memo WHERE operation = ? AND key = ?",
+                (operation, key),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.connection.execute(
+                "UPDATE memo SET last_used = ? WHERE operation = ? AND key = ?",
+                (time.time(), operation, key),
+            )
+        return json.loads(row[0])
+
+    def put(self, operation, key, value):
+        """
+        Stores a JSON-serializable value, evicting old entries if needed.
+        """
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO memo (operation, key, value, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (operation, key, json.dumps(value), time.time()),
+            )
+            self._writes += 1
+            # Counting rows on every write would cost more than the lookup
+            # saves.
+            if self._writes % 1000 == 0 or self._writes == 1:
+                self.evict()
+
+    def get_or_compute(self, operation, key, compute, cacheable=None):
+        """
+        Returns the stored value for (operation, key), calling compute() and
+        storing its result on a miss. compute() runs without the lock.
+
+        Parameters:
+        cacheable (callable): If given, a computed value is only stored when
+        cacheable(value) is true.
+        """
+        value = self.get(operation, key)
+        if value is None:
+            value = compute()
+            if cacheable is None or cacheable(value):
+                self.put(operation, key, value)
+        return value
+
+    def evict(self):
+        """
+        Drops the least recently used entries beyond max_entries.
+
+        Returns:
+        int: The number of entries removed.
+        """
+        with self._lock:
+            excess = len(self) - self.max_entries
+            if excess <= 0:
+                return 0
+            self.connection.execute(
+                "DELETE FROM memo WHERE rowid IN "
+                "(SELECT rowid FROM memo ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+        return excess
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "version": self.version,
+        }
+
+    def clear(self):
+        with self._lock:
+            self.connection.execute("DELETE FROM memo")
+            self.hits = self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+
+_default_store = None
+
+
+def get_default_store():
+    """
+    Returns the store at CHEMISTRY_MEMO_PATH, opened on first use, or None
+    if memoization is turned off or the file cannot be opened.
+    """
+    global _default_store
+    if _default_store is None:
+        path = os.environ.get("CHEMISTRY_MEMO_PATH", MEMO_PATH)
+        if not path:
+            _default_store = False
+        else:
+            try:
+                _default_store = MemoStore(path)
+            except sqlite3.Error as e:
+                print(f"Could not open the memo store at {path}: {e}")
+                _default_store = False
+    # Not "or None": an empty store is falsy because it defines __len__.
+    return None if _default_store is False else _default_store
@@ -0,0 +1,287 @@
+"""
+Counters, histograms and timers for the calculators, in Prometheus format.
+
+The parse, balance, solve and render stages of the calculators record how
+long they take in histograms, and errors are counted by operation and
+exception type before they are turned into messages. render() writes every
+metric in the Prometheus text exposition format; equilibrium_calculator.py
+serves it at /metrics, and start_http_server() does the same for other
+processes.
+
+Set CHEMISTRY_METRICS=0 to disable recording. Disabled timers are a shared
+object whose enter and exit do nothing, and timed() functions call straight
+through after one attribute check.
+
+Metrics are kept per process, so each gunicorn worker reports its own.
+
+Example:
+    with timer("chemistry_stage_seconds", operation="balance", stage="parse"):
+        reactants, products = parse_chemical_equation(reaction)
+    counter("chemistry_errors_total", operation="balance", error="ValueError").inc()
+"""
+
+import bisect
+import functools
+import math
+import os
+import threading
+import time
+
+BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+HELP = {
+    "chemistry_operation_seconds": "Time per calculator call, memo hits included.",
+    "chemistry_stage_seconds": "Time spent in each calculator stage.",
+    "chemistry_errors_total": "Calculator errors by operation and exception type.",
+    "chemistry_requests_total": "HTTP requests by endpoint and status code.",
+    "chemistry_request_seconds": "HTTP request latency by endpoint.",
+}
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    A value that only goes up.
+    """
+
+    def __init__(self, registry, labels):
+        self._registry = registry
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name):
+        yield name, self.labels, self.value
+
+
+class Histogram:
+    """
+    Counts observations in cumulative buckets, with their sum and count.
+    """
+
+    def __init__(self, registry, labels, buckets=BUCKETS):
+        self._registry = registry
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        if not self._registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        """
+        A context manager that observes the time spent inside it.
+        """
+        if not self._registry.enabled:
+            return NULL_TIMER
+        return Timer(self)
+
+    def samples(self, name):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            yield f"{name}_bucket", self.labels + (("le", _number(bound)),), cumulative
+        yield f"{name}_sum", self.labels, total
+        yield f"{name}_count", self.labels, cumulative
+
+
+class Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Registry:
+    """
+    All metrics of a process, keyed by name and labels.
+
+    Parameters:
+    enabled (bool): Whether metrics record anything.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = {}
+        self._types = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name, labels, factory):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                if self._types.setdefault(name, kind) != kind:
+                    raise ValueError(f"{name} is already a {self._types[name]}")
+                metric = self._metrics.setdefault(key, factory(key[1]))
+        return metric
+
+    def counter(self, name, **labels):
+        return self._get("counter", name, labels, lambda l: Counter(self, l))
+
+    def histogram(self, name, buckets=BUCKETS, **labels):
+        return self._get(
+            "histogram", name, labels, lambda l: Histogram(self, l, buckets)
+        )
+
+    def timer(self, name, **labels):
+        """
+        Times a block into the histogram name with the given labels.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self.histogram(name, **labels))
+
+    def timed(self, name, **labels):
+        """
+        Decorator that times every call into the histogram name.
+        """
+
+        def decorator(function):
+            histogram = self.histogram(name, **labels)
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items(), key=lambda item: item[0])
+        lines = []
+        current = None
+        for (name, _), metric in metrics:
+            if name != current:
+                current = name
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {self._types[name]}")
+            for sample, labels, value in metric.samples(name):
+                lines.append(f"{sample}{_label_text(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(enabled=os.environ.get("CHEMISTRY_METRICS", "1") != "0")
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+render = REGISTRY.render
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def count_error(operation, error):
+    """
+    Counts an exception under chemistry_errors_total before it is handled.
+    """
+    counter(
+        "chemistry_errors_total", operation=operation, error=type(error).__name__
+    ).inc()
+
+
+def start_http_server(port=9100, host="127.0.0.1", registry=REGISTRY):
+    """
+    Serves registry.render() at http://host:port/metrics from a daemon
+    thread, for processes without a web app.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
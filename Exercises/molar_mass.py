@@ -0,0 +1,110 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+
+from formula_parser import N_COLUMNS, formula_to_composition
+from periodic_table import ELECTRON_MASS, RELATIVE_ATOMIC_MASSES
+
+# Column 0 holds the net charge (electron deficiency), columns 1..118 hold
+# the atomic numbers, the same layout chempy uses for Substance.composition.
+ATOMIC_WEIGHTS = np.empty(N_COLUMNS)
+ATOMIC_WEIGHTS[0] = -ELECTRON_MASS
+ATOMIC_WEIGHTS[1:] = RELATIVE_ATOMIC_MASSES
+
+CACHE_SIZE = 65536
+
+
+def normalize_formula(formula):
+    """
+    Normalize a formula string so equivalent spellings share a cache entry.
+
+    Parameters:
+    formula (str): A chemical formula, e.g. " H2O ".
+
+    Returns:
+    str: The formula without surrounding or embedded whitespace.
+    """
+    return "".join(formula.split())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _composition_vector(formula):
+    # Parse once and keep only the sparse (column, count) pairs.
+    composition = formula_to_composition(formula)
+    columns = np.fromiter(composition.keys(), dtype=np.intp, count=len(composition))
+    counts = np.fromiter(composition.values(), dtype=float, count=len(composition))
+    return columns, counts
+
+
+def composition_matrix(formulas):
+    """
+    Build a sparse formula x element count matrix.
+
+    Parameters:
+    formulas (iterable of str): Chemical formulas, e.g. ["H2O", "Fe(CN)6-3"].
+
+    Returns:
+    scipy.sparse.csr_matrix: One row per formula, one column per atomic
+    number (column 0 is the net charge).
+    """
+    columns, counts, indptr = [], [], [0]
+    for formula in formulas:
+        cols, cnts = _composition_vector(normalize_formula(formula))
+        columns.append(cols)
+        counts.append(cnts)
+        indptr.append(indptr[-1] + len(cols))
+
+    if not columns:
+        return sparse.csr_matrix((0, N_COLUMNS))
+
+    return sparse.csr_matrix(
+        (np.concatenate(counts), np.concatenate(columns), np.asarray(indptr)),
+        shape=(len(indptr) - 1, N_COLUMNS),
+    )
+
+
+def molar_masses(formulas):
+    """
+    Calculate the molar masses of many substances in one call.
+
+    This is the batch counterpart of calculate_substance_properties: it does
+    not print and does not build a quantities object per formula. Parsed
+    compositions are kept in an LRU cache keyed by the normalized formula.
+
+    Parameters:
+    formulas (iterable of str): Chemical formulas, e.g. ["H2O", "NaCl"].
+
+    Returns:
+    numpy.ndarray: The molar masses in g/mol, in input order.
+    """
+    return composition_matrix(formulas) @ ATOMIC_WEIGHTS
+
+
+def molar_mass(formula):
+    """
+    Calculate the molar mass of a single substance in g/mol.
+    """
+    cols, cnts = _composition_vector(normalize_formula(formula))
+    return float(cnts @ ATOMIC_WEIGHTS[cols])
+
+
+def cache_info():
+    """
+    Return the hit/miss statistics of the parsed-formula cache.
+    """
+    return _composition_vector.cache_info()
+
+
+def clear_cache():
+    """
+    Empty the parsed-formula cache.
+    """
+    _composition_vector.cache_clear()
+
+
+if __name__ == "__main__":
+    example = ["H2O", "NaCl", "Fe(CN)6-3", "CuSO4·5H2O", "H2O"]
+    for formula, mass in zip(example, molar_masses(example)):
+        print(f"{formula}: {mass:.4f} g/mol")
+    print(cache_info())
@@ -0,0 +1,150 @@
+"""
+Persistent store for the names and sessions of the console programs.
+
+The console programs used to pickle the whole names list to names.pydata
+on exit and read it all back on start, so every lookup scanned the list
+and a crash lost everything entered since the last clean exit. NameStore
+keeps the names in SQLite instead: each name is committed as soon as it is
+added, lookups go through the primary-key index, and the database runs in
+WAL mode so a crash never leaves it half written.
+
+The first time a store is opened next to an old names.pydata, the pickled
+names are copied in once; the pickle file itself is left alone.
+"""
+
+import os
+import pickle
+import sqlite3
+import time
+import warnings
+
+DB_PATH = "names.sqlite3"
+PICKLE_PATH = "names.pydata"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT PRIMARY KEY,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    program TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class NameStore:
+    """
+    SQLite-backed set of names, kept in the order they were added.
+
+    Parameters:
+    path (str): The database file; created if it does not exist.
+    pickle_path (str): An old names.pydata file to migrate from, or None.
+    """
+
+    def __init__(self, path=DB_PATH, pickle_path=PICKLE_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=10)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        if pickle_path is not None:
+            self.migrate_pickle(pickle_path)
+
+    def __contains__(self, name):
+        row = self.connection.execute(
+            "SELECT 1 FROM names WHERE name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        rows = self.connection.execute("SELECT name FROM names ORDER BY rowid")
+        return (name for (name,) in rows)
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+
+    def add(self, name):
+        """
+        Adds a name and commits it right away.
+
+        Returns:
+        bool: True if the name was new, False if it was already stored.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO names (name, added_at) VALUES (?, ?)",
+                (name, time.time()),
+            )
+        return cursor.rowcount == 1
+
+    def add_many(self, names):
+        """
+        Adds several names in one transaction and returns how many were new.
+        """
+        now = time.time()
+        with self.connection:
+            cursor = self.connection.executemany(
+                "INSERT OR IGNORE INTO names (name, added_at) VALUES (?, ?)",
+                [(name, now) for name in names],
+            )
+        return cursor.rowcount
+
+    def start_session(self, program):
+        """
+        Records the start of a program run and returns the session id.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO sessions (program, started_at) VALUES (?, ?)",
+                (program, time.time()),
+            )
+        return cursor.lastrowid
+
+    def end_session(self, session_id):
+        """
+        Records the end of a program run.
+        """
+        with self.connection:
+            self.connection.execute(
+                "UPDATE sessions SET ended_at = ? WHERE id = ?",
+                (time.time(), session_id),
+            )
+
+    def migrate_pickle(self, pickle_path=PICKLE_PATH):
+        """
+        Copies the names from an old names.pydata pickle, once per database.
+
+        A corrupt or truncated pickle is skipped with a warning and left in
+        place, as the console programs used to start with no names.
+
+        Returns:
+        int: The number of names migrated (0 if already done, no file, or
+        the file could not be read).
+        """
+        done = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'migrated_pickle'"
+        ).fetchone()
+        if done is not None or not os.path.exists(pickle_path):
+            return 0
+        try:
+            with open(pickle_path, "rb") as file_object:
+                names = pickle.load(file_object)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+            warnings.warn(f"Could not read names from {pickle_path}, skipped: {e}")
+            return 0
+        added = self.add_many(str(name) for name in names)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_pickle', ?)",
+                (os.path.abspath(pickle_path),),
+            )
+        return added
+
+    def close(self):
+        self.connection.close()
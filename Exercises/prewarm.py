@@ -0,0 +1,50 @@
+"""
+Background pre-warming of heavy imports for the console calculators.
+
+The console scripts import chempy, quantities and the balancer only inside
+the menu actions that need them, so the menu shows up immediately. Once the
+first prompt is on screen, start_prewarm() imports those modules in a
+daemon thread while the user is still typing, so the first action is fast
+too. Set CHEMISTRY_PREWARM=0 to turn this off.
+"""
+
+import importlib
+import os
+import threading
+
+_started = False
+_lock = threading.Lock()
+
+
+def _import_all(module_names):
+    for name in module_names:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # The menu action will raise the same error when it is chosen.
+            pass
+
+
+def start_prewarm(module_names):
+    """
+    Imports modules in a background thread, once per process.
+
+    Parameters:
+    module_names (list of str): The modules to import, in order.
+
+    Returns:
+    threading.Thread: The pre-warm thread, or None if it already ran or is
+    disabled.
+    """
+    global _started
+    if os.environ.get("CHEMISTRY_PREWARM", "1") == "0":
+        return None
+    with _lock:
+        if _started:
+            return None
+        _started = True
+    thread = threading.Thread(
+        target=_import_all, args=(list(module_names),), name="prewarm", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,121 @@
+"""
+TTL + LRU cache of rendered equilibrium pages.
+
+Classroom traffic to equilibrium_calculator.py repeats the same handful of
+reactions, so the LaTeX expression and the rendered HTML are kept in memory
+keyed by the normalized reaction string. Entries expire after a fixed time
+and the least recently used entry is dropped when the cache is full. Each
+entry carries an ETag so browsers can revalidate with a conditional GET.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+CACHE_SIZE = 1024
+TTL = 600
+
+CachedResponse = namedtuple("CachedResponse", "equilibrium_expr html etag expires")
+
+
+def make_etag(html):
+    """
+    Returns a strong ETag (unquoted) for a rendered page.
+    """
+    return hashlib.sha1(html.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered responses whose entries expire after ttl seconds.
+
+    Parameters:
+    maxsize (int): The maximum number of responses to keep.
+    ttl (float): How long an entry stays valid, in seconds.
+    clock (callable): Returns the current time; time.monotonic by default.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.not_modified = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return the cached response for a key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, equilibrium_expr, html):
+        """
+        Store a rendered response and return the cache entry.
+        """
+        entry = CachedResponse(
+            equilibrium_expr, html, make_etag(html), self.clock() + self.ttl
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def get_or_render(self, key, render):
+        """
+        Return the cached response for a key, calling render() on a miss.
+
+        Parameters:
+        key (str): The normalized reaction.
+        render (callable): Returns (equilibrium_expr, html) for the key.
+        """
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, *render())
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        """
+        Return the hit, miss, eviction and expiry counters and the size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "not_modified": self.not_modified,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+            self.not_modified = 0
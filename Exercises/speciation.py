@@ -0,0 +1,455 @@
+"""
+Speciation of many coupled equilibria with mass and charge balances.
+
+calculate_equilibrium_and_ph solves one reaction string with EqSystem.
+SpeciationSystem takes any number of reactions (polyprotic acids, buffers,
+metal complexes) and solves for every species at once. The unknowns are
+x = ln c, which makes each mass-action law linear,
+
+    sum_s nu_rs * x_s = ln K_r,
+
+and the remaining equations are one mass balance per component,
+ln(sum_s a_bs * c_s) = ln T_b, and the charge balance, written the same
+way as ln(positive charge) = ln(negative charge). Each row only involves the species in it,
+so the Jacobian is assembled as a sparse matrix from its analytic entries
+and every Newton step is one sparse LU solve. Steps are limited in size
+and backtracked until the residual falls.
+
+Example:
+    system = SpeciationSystem([
+        "H2CO3 = H+ + HCO3-; 10**-6.35",
+        "HCO3- = H+ + CO3-2; 10**-10.33",
+        "H2O = H+ + OH-; 1e-14",
+    ], species=["Na+"])
+    result = system.solve({"C": 0.01, "Na": 0.015})
+    result.pH, result.iterations
+"""
+
+import ast
+import math
+import operator
+import re
+import time
+import warnings
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from formula_parser import formula_to_composition
+from periodic_table import SYMBOLS
+
+MAX_ITERATIONS = 200
+TOLERANCE = 1e-10
+MAX_STEP = 4.0
+TINY = 1e-30
+# Longer constants are rejected before they reach the parser.
+MAX_CONSTANT_LENGTH = 200
+
+SpeciationResult = namedtuple(
+    "SpeciationResult",
+    "species concentrations pH iterations residual converged elapsed",
+)
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+_COEFFICIENT = re.compile(r"(\d+(?:\.\d+)?)\s+(\S+)$")
+_CHARGE = re.compile(r"([+-])(\d*)$")
+
+
+def _evaluate(node):
+    # Numbers are floats, so a huge power raises OverflowError at once
+    # instead of building an enormous integer.
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if (
+        isinstance(node, ast.Constant)
+        and isinstance(node.value, (int, float))
+        and not isinstance(node.value, bool)
+    ):
+        return float(node.value)
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.left), _evaluate(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.operand))
+    raise ValueError(f"Unsupported equilibrium constant: {ast.dump(node)}")
+
+
+def parse_constant(text):
+    """
+    Evaluates an equilibrium constant such as "1.8*10**-5" without eval().
+
+    Raises:
+    ValueError: If the text is not arithmetic on numbers or its value is
+    not a finite real number.
+    """
+    if len(text) > MAX_CONSTANT_LENGTH:
+        raise ValueError(
+            f"Equilibrium constant longer than {MAX_CONSTANT_LENGTH} characters"
+        )
+    try:
+        value = float(_evaluate(ast.parse(text.strip(), mode="eval")))
+    except (SyntaxError, OverflowError, ZeroDivisionError, TypeError) as e:
+        raise ValueError(f"Invalid equilibrium constant {text!r}: {e}") from None
+    if not math.isfinite(value):
+        raise ValueError(f"Equilibrium constant {text!r} is not finite")
+    return value
+
+
+def _parse_side(side):
+    terms = {}
+    for term in side.split(" + "):
+        term = term.strip()
+        match = _COEFFICIENT.match(term)
+        coefficient, name = (
+            (float(match.group(1)), match.group(2)) if match else (1.0, term)
+        )
+        terms[name] = terms.get(name, 0.0) + coefficient
+    return terms
+
+
+def parse_reactions(reactions):
+    """
+    Parses reactions in the calculator's 'A = B + C; K' format.
+
+    Parameters:
+    reactions (str or list of str): One reaction per item or per line.
+    Species on each side are separated by ' + ' (with spaces, since '+'
+    is also a charge) and may have a leading coefficient, e.g. '2 OH-'.
+
+    Returns:
+    list of tuple: (stoichiometry dict, K) per reaction, products positive.
+    """
+    if isinstance(reactions, str):
+        reactions = reactions.splitlines()
+    parsed = []
+    for reaction in reactions:
+        reaction = reaction.strip()
+        if not reaction:
+            continue
+        try:
+            equation, constant = reaction.split(";", 1)
+            left, right = equation.split("=")
+        except ValueError:
+            raise ValueError(f"Expected 'A = B + C; K', got {reaction!r}")
+        stoichiometry = {s: -n for s, n in _parse_side(left).items()}
+        for name, n in _parse_side(right).items():
+            stoichiometry[name] = stoichiometry.get(name, 0.0) + n
+        parsed.append((stoichiometry, parse_constant(constant)))
+    return parsed
+
+
+def species_charge(name):
+    """
+    The charge of a species: from its formula, or from a trailing '+2'/'-'
+    for names that are not formulas (e.g. 'EDTA-4').
+    """
+    try:
+        return formula_to_composition(name).get(0, 0)
+    except ValueError:
+        match = _CHARGE.search(name)
+        if match is None:
+            return 0
+        return int(match.group(1) + (match.group(2) or "1"))
+
+
+def element_balances(species, exclude=("H", "O")):
+    """
+    Builds one mass balance per element from the species' formulas.
+
+    H and O are left out because water supplies them; the charge balance
+    takes the place of the proton balance.
+
+    Returns:
+    dict: Element symbol -> {species: count}.
+    """
+    balances = {}
+    for name in species:
+        for number, count in formula_to_composition(name).items():
+            if number == 0 or SYMBOLS[number - 1] in exclude:
+                continue
+            balances.setdefault(SYMBOLS[number - 1], {})[name] = count
+    return balances
+
+
+class SpeciationSystem:
+    """
+    A set of coupled equilibria, compiled once and solved for any totals.
+
+    Parameters:
+    reactions (str or list of str): Reactions as 'A = B + C; K'.
+    mass_balances (dict): Balance name -> {species: coefficient}. Defaults
+    to element_balances() of the species.
+    charge_balance (bool): Require the solution to be electrically neutral.
+    solvent (str): A species with activity 1 that is not solved for.
+    species (list of str): Species in no reaction, such as the spectator
+    ions Na+ and Cl-; each needs a mass balance of its own.
+    """
+
+    def __init__(
+        self,
+        reactions,
+        mass_balances=None,
+        charge_balance=True,
+        solvent="H2O",
+        species=(),
+    ):
+        parsed = parse_reactions(reactions)
+        names = {}
+        for stoichiometry, _ in parsed:
+            for name in stoichiometry:
+                if name != solvent:
+                    names.setdefault(name, len(names))
+        for name in species:
+            names.setdefault(name, len(names))
+        if mass_balances is None:
+            mass_balances = element_balances(names)
+        for balance in mass_balances.values():
+            for name in balance:
+                names.setdefault(name, len(names))
+        self.species = list(names)
+        self.balances = list(mass_balances)
+        self.solvent = solvent
+        n = len(self.species)
+
+        rows, cols, values = [], [], []
+        for row, (stoichiometry, _) in enumerate(parsed):
+            for name, nu in stoichiometry.items():
+                if name != solvent and nu:
+                    rows.append(row)
+                    cols.append(names[name])
+                    values.append(nu)
+        self.stoichiometry = sparse.csr_matrix(
+            (values, (rows, cols)), shape=(len(parsed), n)
+        )
+        self.log_k = np.log([k for _, k in parsed])
+
+        rows, cols, values = [], [], []
+        for row, name in enumerate(self.balances):
+            for species, coefficient in mass_balances[name].items():
+                rows.append(row)
+                cols.append(names[species])
+                values.append(coefficient)
+        self.composition = sparse.csr_matrix(
+            (values, (rows, cols)), shape=(len(self.balances), n)
+        )
+
+        self.charges = np.array([species_charge(s) for s in self.species], float)
+        self.charge_balance = charge_balance and bool(self.charges.any())
+        if self.charge_balance and not (
+            (self.charges > 0).any() and (self.charges < 0).any()
+        ):
+            raise ValueError("A charge balance needs both cations and anions")
+        self.h_index = names.get("H+")
+
+        equations = len(parsed) + len(self.balances) + self.charge_balance
+        if equations != n:
+            raise ValueError(
+                f"{n} species but {equations} equations ({len(parsed)} reactions, "
+                f"{len(self.balances)} mass balances, "
+                f"{int(self.charge_balance)} charge balance)"
+            )
+        self._jacobian_pattern()
+
+    def __repr__(self):
+        return (
+            f"SpeciationSystem({len(self.species)} species, "
+            f"{self.stoichiometry.shape[0]} reactions, balances {self.balances})"
+        )
+
+    def initial_guess(self, totals):
+        """
+        Starts every species at the smallest total it belongs to, shared
+        between the species of that balance; others at 1e-7 M.
+        """
+        counts = np.diff(self.composition.indptr)
+        per_balance = np.where(counts > 0, totals / np.maximum(counts, 1), np.inf)
+        share = self.composition.multiply(per_balance[:, None]).tocsc()
+        share.data[share.data <= 0] = np.inf
+        guess = np.full(len(self.species), 1e-7)
+        members = np.flatnonzero(np.diff(share.indptr))
+        if members.size:
+            guess[members] = np.minimum.reduceat(share.data, share.indptr[members])
+        guess[~np.isfinite(guess)] = 1e-7
+        return np.log(guess)
+
+    def _jacobian_pattern(self):
+        # The Jacobian's nonzeros never move: the stoichiometry rows, the
+        # species of each mass balance and the charged species. Map them
+        # once to CSC order so each Newton step only fills in values.
+        n_reactions, n_balances = self.stoichiometry.shape[0], len(self.balances)
+        stoichiometry = self.stoichiometry.tocoo()
+        composition = self.composition.tocoo()
+        charged = np.flatnonzero(self.charges if self.charge_balance else [])
+        rows = np.concatenate(
+            (
+                stoichiometry.row,
+                composition.row + n_reactions,
+                np.full(len(charged), n_reactions + n_balances),
+            )
+        )
+        cols = np.concatenate((stoichiometry.col, composition.col, charged))
+        n = len(self.species)
+        pattern = sparse.csc_matrix(
+            (np.arange(1, len(rows) + 1), (rows, cols)), shape=(n, n)
+        )
+        self._order = pattern.data - 1
+        self._indices, self._indptr = pattern.indices, pattern.indptr
+        self._stoichiometry_values = stoichiometry.data
+        self._balance_rows, self._balance_cols = composition.row, composition.col
+        self._balance_values = composition.data
+        self._charged = charged
+
+    def residual(self, x, log_totals):
+        """
+        The residual of every equation at x = ln c.
+        """
+        c = np.exp(x)
+        parts = [
+            self.stoichiometry @ x - self.log_k,
+            np.log(self.composition @ c) - log_totals,
+        ]
+        if self.charge_balance:
+            zc = self.charges * c
+            parts.append([np.log(zc[zc > 0].sum()) - np.log(-zc[zc < 0].sum())])
+        return np.concatenate(parts)
+
+    def jacobian(self, x):
+        """
+        The sparse analytic Jacobian of residual() with respect to x.
+        """
+        c = np.exp(x)
+        sums = self.composition @ c
+        values = [
+            self._stoichiometry_values,
+            self._balance_values * c[self._balance_cols] / sums[self._balance_rows],
+        ]
+        if self.charge_balance:
+            zc = self.charges[self._charged] * c[self._charged]
+            positive = zc > 0
+            values.append(
+                np.where(positive, zc / zc[positive].sum(), -zc / zc[~positive].sum())
+            )
+        n = len(self.species)
+        return sparse.csc_matrix(
+            (np.concatenate(values)[self._order], self._indices, self._indptr),
+            shape=(n, n),
+        )
+
+    def solve(
+        self, totals, guess=None, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS
+    ):
+        """
+        Solves for the equilibrium concentrations.
+
+        Parameters:
+        totals (dict): Balance name -> total concentration in M. Totals of
+        zero are treated as 1e-30 M so their logarithm exists.
+        guess (dict or array): Optional starting concentrations, e.g. a
+        neighbouring solution's.
+        tolerance (float): The residual norm to reach.
+        max_iterations (int): Newton iterations before giving up.
+
+        Returns:
+        SpeciationResult: species, concentrations (in that order), pH,
+        Newton iterations, the final residual norm, whether it
+        converged, and the time taken in seconds.
+        """
+        start = time.perf_counter()
+        missing = set(self.balances) - set(totals)
+        if missing:
+            raise ValueError(f"Missing totals for {sorted(missing)}")
+        log_totals = np.log(
+            np.maximum([float(totals[name]) for name in self.balances], TINY)
+        )
+        if guess is None:
+            x = self.initial_guess(np.exp(log_totals))
+        elif isinstance(guess, dict):
+            x = self.initial_guess(np.exp(log_totals))
+            for name, value in guess.items():
+                x[self.species.index(name)] = np.log(max(value, TINY))
+        else:
+            x = np.log(np.maximum(np.asarray(guess, float), TINY))
+
+        residual = self.residual(x, log_totals)
+        norm = np.linalg.norm(residual)
+        iterations = 0
+        while norm > tolerance and iterations < max_iterations:
+            iterations += 1
+            step = -splu(self.jacobian(x)).solve(residual)
+            largest = np.abs(step).max()
+            if largest > MAX_STEP:
+                step *= MAX_STEP / largest
+            # Backtrack until the residual falls.
+            for _ in range(30):
+                candidate = self.residual(x + step, log_totals)
+                candidate_norm = np.linalg.norm(candidate)
+                if np.isfinite(candidate_norm) and candidate_norm < norm:
+                    break
+                step /= 2
+            else:
+                break  # no step reduces the residual any more
+            x = x + step
+            residual, norm = candidate, candidate_norm
+
+        converged = norm <= tolerance
+        if not converged:
+            warnings.warn(
+                f"Speciation did not converge in {iterations} iterations "
+                f"(residual {norm:.2e})."
+            )
+        concentrations = np.exp(x)
+        h = concentrations[self.h_index] if self.h_index is not None else 1e-7
+        return SpeciationResult(
+            self.species,
+            concentrations,
+            -np.log10(h),
+            iterations,
+            norm,
+            converged,
+            time.perf_counter() - start,
+        )
+
+
+if __name__ == "__main__":
+    # Phosphate, carbonate and ammonia buffers with calcium and copper
+    # complexes: 25 species, 17 reactions.
+    system = SpeciationSystem(
+        [
+            "H3PO4 = H+ + H2PO4-; 10**-2.15",
+            "H2PO4- = H+ + HPO4-2; 10**-7.20",
+            "HPO4-2 = H+ + PO4-3; 10**-12.35",
+            "H2CO3 = H+ + HCO3-; 10**-6.35",
+            "HCO3- = H+ + CO3-2; 10**-10.33",
+            "NH4+ = H+ + NH3; 10**-9.25",
+            "Ca+2 + CO3-2 = CaCO3; 10**3.2",
+            "Ca+2 + HCO3- = CaHCO3+; 10**1.1",
+            "Ca+2 + HPO4-2 = CaHPO4; 10**2.7",
+            "Ca+2 + OH- = CaOH+; 10**1.3",
+            "Cu+2 + NH3 = CuNH3+2; 10**4.0",
+            "CuNH3+2 + NH3 = Cu(NH3)2+2; 10**3.3",
+            "Cu(NH3)2+2 + NH3 = Cu(NH3)3+2; 10**2.7",
+            "Cu(NH3)3+2 + NH3 = Cu(NH3)4+2; 10**2.0",
+            "Cu+2 + OH- = CuOH+; 10**6.3",
+            "Cu+2 + CO3-2 = CuCO3; 10**6.7",
+            "H2O = H+ + OH-; 1e-14",
+        ],
+        species=["Na+", "Cl-"],
+    )
+    print(system)
+    totals = {"P": 0.01, "C": 0.02, "N": 0.05, "Ca": 0.005, "Cu": 0.001}
+    for sodium in (0.0, 0.02, 0.05):
+        result = system.solve({**totals, "Na": sodium, "Cl": 0.012})
+        print(
+            f"Na {sodium:.2f} M: pH {result.pH:.3f} in {result.iterations} "
+            f"iterations, {result.elapsed * 1000:.1f} ms "
+            f"(residual {result.residual:.1e})"
+        )
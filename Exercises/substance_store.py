@@ -0,0 +1,252 @@
+"""
+Compact, array-backed storage for large numbers of substances.
+
+A chempy Substance carries a name, a LaTeX name, a unicode name, an HTML
+name, a composition dict and a data dict, which adds up to about 800 bytes
+per substance. SubstanceStore keeps the same information in a handful of
+contiguous NumPy arrays instead:
+
+    indptr, columns, counts   the compositions in CSR form: the element
+                              columns (atomic number, 0 for the net charge)
+                              and counts of substance i are
+                              columns[indptr[i]:indptr[i + 1]] and counts[...]
+    masses                    molar masses in g/mol, worked out with
+                              molar_mass.ATOMIC_WEIGHTS when each substance
+                              is added
+    text, offsets             the formulas as one UTF-8 buffer
+
+store[i] returns a SubstanceView, a two-slot object that reads from the
+arrays on demand, so only the arrays stay in memory. arrays() returns
+views of the arrays without copying them.
+
+Example:
+    store = SubstanceStore(["H2O", "NaCl", "Fe(CN)6-3"])
+    store[2].mass                   # 211.95...
+    store.masses                    # array([ 18.015,  58.44 , 211.95 ])
+    store.composition_matrix()      # 3 x 119 scipy.sparse.csr_matrix
+"""
+
+import numpy as np
+from scipy import sparse
+
+from formula_parser import N_COLUMNS
+from molar_mass import ATOMIC_WEIGHTS, _composition_vector, normalize_formula
+
+INITIAL_CAPACITY = 1024
+
+
+def _grow(array, size):
+    # At least doubles the capacity, so appends are amortized O(1) while a
+    # large extend() allocates only what it needs. The old array is left
+    # untouched, so views handed out earlier stay valid.
+    if size <= len(array):
+        return array
+    grown = np.empty(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class SubstanceView:
+    """
+    One substance of a SubstanceStore, read from the store's arrays.
+    """
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __repr__(self):
+        return f"SubstanceView({self.formula!r}, mass={self.mass:.4f})"
+
+    @property
+    def formula(self):
+        return self.store.formula(self.index)
+
+    @property
+    def mass(self):
+        return float(self.store._masses[self.index])
+
+    @property
+    def charge(self):
+        columns, counts = self.store.element_counts(self.index)
+        return int(counts[columns == 0].sum())
+
+    @property
+    def composition(self):
+        """
+        Atomic number -> count, with key 0 holding the net charge, as in
+        chempy's Substance.composition.
+        """
+        columns, counts = self.store.element_counts(self.index)
+        return {
+            int(column): int(count) if count == int(count) else float(count)
+            for column, count in zip(columns, counts)
+        }
+
+    def to_substance(self):
+        """
+        Builds the full chempy Substance for this formula.
+        """
+        from chempy import Substance
+
+        return Substance.from_formula(self.formula)
+
+
+class SubstanceStore:
+    """
+    Substances kept as CSR composition arrays, molar masses and formulas.
+
+    Parameters:
+    formulas (iterable of str): Formulas to add, e.g. ["H2O", "NaCl"].
+    """
+
+    def __init__(self, formulas=()):
+        self._size = 0
+        self._indptr = np.zeros(INITIAL_CAPACITY + 1, dtype=np.int64)
+        self._columns = np.empty(INITIAL_CAPACITY, dtype=np.uint8)
+        self._counts = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self._masses = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self._offsets = np.zeros(INITIAL_CAPACITY + 1, dtype=np.int64)
+        self._text = np.empty(INITIAL_CAPACITY * 8, dtype=np.uint8)
+        self.extend(formulas)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("substance index out of range")
+        return SubstanceView(self, index)
+
+    def __iter__(self):
+        return (SubstanceView(self, index) for index in range(self._size))
+
+    def __repr__(self):
+        return f"<SubstanceStore of {self._size} substances, {self.nbytes} bytes>"
+
+    def append(self, formula):
+        """
+        Adds one formula and returns its index.
+        """
+        self.extend([formula])
+        return self._size - 1
+
+    def extend(self, formulas):
+        """
+        Parses and adds many formulas in one go.
+
+        Parsing goes through molar_mass's cache, so repeated formulas are
+        parsed once. A formula that fails to parse raises ValueError and
+        nothing from the call is added.
+        """
+        formulas = [normalize_formula(formula) for formula in formulas]
+        if not formulas:
+            return
+        vectors = [_composition_vector(formula) for formula in formulas]
+        encoded = [formula.encode("utf-8") for formula in formulas]
+
+        lengths = np.array([len(columns) for columns, _ in vectors])
+        columns = np.concatenate([columns for columns, _ in vectors])
+        counts = np.concatenate([counts for _, counts in vectors])
+        rows = np.repeat(np.arange(len(formulas)), lengths)
+        masses = np.bincount(
+            rows, weights=counts * ATOMIC_WEIGHTS[columns], minlength=len(formulas)
+        )
+        text = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        start, end = self._size, self._size + len(formulas)
+        nnz, chars = self._indptr[start], self._offsets[start]
+        self._indptr = _grow(self._indptr, end + 1)
+        self._offsets = _grow(self._offsets, end + 1)
+        self._masses = _grow(self._masses, end)
+        self._columns = _grow(self._columns, nnz + len(columns))
+        self._counts = _grow(self._counts, nnz + len(counts))
+        self._text = _grow(self._text, chars + len(text))
+
+        self._indptr[start + 1 : end + 1] = nnz + np.cumsum(lengths)
+        self._columns[nnz : nnz + len(columns)] = columns
+        self._counts[nnz : nnz + len(counts)] = counts
+        self._masses[start:end] = masses
+        self._offsets[start + 1 : end + 1] = chars + np.cumsum(
+            [len(formula) for formula in encoded]
+        )
+        self._text[chars : chars + len(text)] = text
+        self._size = end
+
+    def formula(self, index):
+        """
+        The normalized formula of substance index.
+        """
+        first, last = self._offsets[index], self._offsets[index + 1]
+        return self._text[first:last].tobytes().decode("utf-8")
+
+    def element_counts(self, index):
+        """
+        The element columns and counts of substance index, as array views.
+        """
+        first, last = self._indptr[index], self._indptr[index + 1]
+        return self._columns[first:last], self._counts[first:last]
+
+    @property
+    def masses(self):
+        """
+        The molar masses in g/mol, as a read-only view.
+        """
+        return self.arrays()["masses"]
+
+    @property
+    def nbytes(self):
+        """
+        Bytes used by the stored data, not counting spare capacity.
+        """
+        return sum(array.nbytes for array in self.arrays().values())
+
+    def arrays(self):
+        """
+        Read-only views of the stored arrays, trimmed to the stored
+        substances; nothing is copied.
+
+        Returns:
+        dict: indptr (int64), columns (uint8), counts (float64), masses
+        (float64), offsets (int64) and text (uint8, UTF-8 formulas).
+        """
+        size = self._size
+        nnz, chars = self._indptr[size], self._offsets[size]
+        views = {
+            "indptr": self._indptr[: size + 1],
+            "columns": self._columns[:nnz],
+            "counts": self._counts[:nnz],
+            "masses": self._masses[:size],
+            "offsets": self._offsets[: size + 1],
+            "text": self._text[:chars],
+        }
+        for view in views.values():
+            view.flags.writeable = False
+        return views
+
+    def composition_matrix(self):
+        """
+        The compositions as a substance x element scipy.sparse.csr_matrix,
+        laid out like molar_mass.composition_matrix. The counts and indptr
+        are shared with the store; the uint8 columns are widened to the
+        index type scipy needs.
+        """
+        arrays = self.arrays()
+        return sparse.csr_matrix(
+            (arrays["counts"], arrays["columns"].astype(np.int32), arrays["indptr"]),
+            shape=(self._size, N_COLUMNS),
+            copy=False,
+        )
+
+
+if __name__ == "__main__":
+    store = SubstanceStore(["H2O", "NaCl", "Fe(CN)6-3", "CuSO4·5H2O", "NH4+"])
+    print(store)
+    for substance in store:
+        print(substance, substance.composition, "charge", substance.charge)
+    print(store.masses)
+    print(store.composition_matrix().toarray()[:, :10])
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from scipy import constants
+
+from arrhenius import csv_blocks, fit_arrhenius, fit_arrhenius_frame
+
+
+def make_log(path, rows=600, seed=0):
+    # Numeric IDs first and "X" only near the end, so the early CSV blocks
+    # look numeric and the last ones do not.
+    rng = np.random.default_rng(seed)
+    reaction = np.where(np.arange(rows) < rows * 0.8, rng.integers(1, 3, rows), 0)
+    reaction = np.where(reaction == 0, "X", reaction.astype(str))
+    T = rng.uniform(280, 380, rows)
+    Ea = np.where(reaction == "X", 80_000.0, 50_000.0)
+    k = 1e10 * np.exp(-Ea / (constants.R * T)) * rng.lognormal(0, 0.01, rows)
+    frame = pd.DataFrame({"reaction": reaction, "T": T, "k": k})
+    frame.to_csv(path, index=False)
+    return frame
+
+
+def test_mixed_ids_across_blocks_are_one_reaction(tmp_path):
+    path = str(tmp_path / "kinetics.csv")
+    frame = make_log(path)
+    assert len(csv_blocks(path, 4000)[1]) > 3
+
+    fits = fit_arrhenius(path, workers=1, block_size=4000)
+    expected = fit_arrhenius_frame(frame)
+
+    assert sorted(fits.index) == ["1", "2", "X"]
+    assert fits.loc[["1", "2", "X"], "n"].tolist() == (
+        expected.loc[["1", "2", "X"], "n"].tolist()
+    )
+    assert fits["n"].sum() == len(frame)
+    np.testing.assert_allclose(
+        fits.loc[["1", "2", "X"], "Ea"], expected.loc[["1", "2", "X"], "Ea"]
+    )
+
+
+def test_numeric_and_string_ids_match():
+    T = np.array([300.0, 320.0, 340.0, 300.0, 320.0, 340.0])
+    k = np.exp(-50_000 / (constants.R * T))
+    numeric = fit_arrhenius_frame(
+        pd.DataFrame({"reaction": [1, 1, 1, 2, 2, 2], "T": T, "k": k})
+    )
+    text = fit_arrhenius_frame(
+        pd.DataFrame({"reaction": ["1", "1", "1", "2", "2", "2"], "T": T, "k": k})
+    )
+    pd.testing.assert_frame_equal(numeric, text)
+    np.testing.assert_allclose(numeric["Ea"], 50_000)
@@ -0,0 +1,32 @@
+import pytest
+from chempy import balance_stoichiometry as chempy_balance
+
+from balancer import balance_stoichiometry
+
+
+@pytest.mark.parametrize(
+    "reactants, products",
+    [
+        ({"H2", "O2"}, {"H2O"}),
+        (["KMnO4", "FeSO4", "H2SO4"], ["K2SO4", "MnSO4", "Fe2(SO4)3", "H2O"]),
+        (["Fe+3", "e-"], ["Fe+2"]),
+    ],
+)
+def test_matches_chempy(reactants, products):
+    expected = chempy_balance(reactants, products)
+    assert balance_stoichiometry(reactants, products) == tuple(map(dict, expected))
+
+
+def test_several_balancings_fall_back_to_chempy():
+    reactants, products = balance_stoichiometry(["H2", "O2"], ["H2O", "H2O2"])
+    expected = chempy_balance(["H2", "O2"], ["H2O", "H2O2"])
+    assert (reactants, products) == tuple(map(dict, expected))
+    assert reactants["H2"].free_symbols
+
+
+@pytest.mark.parametrize(
+    "reactants, products", [(["H2"], ["H2O"]), (["H2", "O2"], ["H2", "H2O"])]
+)
+def test_unbalanceable_reactions_raise(reactants, products):
+    with pytest.raises(ValueError):
+        balance_stoichiometry(reactants, products)
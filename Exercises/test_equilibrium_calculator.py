@@ -0,0 +1,31 @@
+import pytest
+
+from equilibrium_calculator import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize("reaction", ["foo", "A -> B -> C"])
+def test_malformed_reaction_rerenders_form(client, reaction):
+    for response in (
+        client.get("/", query_string={"reaction": reaction}),
+        client.post("/", data={"reaction": reaction}),
+    ):
+        assert response.status_code == 400
+        page = response.get_data(as_text=True)
+        assert "Expected a reaction of the form" in page
+        assert f'value="{reaction.replace(">", "&gt;")}"' in page
+
+
+def test_reaction_renders_expression(client):
+    response = client.post("/", data={"reaction": "2A+4B ->3C"})
+    assert response.status_code == 200
+    assert "K = \\frac{ [3C] }{ [2A] * [4B] }" in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize("body", [{"reaction": 5}, [1, 2], {"reaction": "foo"}])
+def test_api_rejects_bad_input(client, body):
+    assert client.post("/api/equilibrium", json=body).status_code == 400
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from kinetics import KineticsModel
+from wk7 import parse_reaction
+
+
+def test_parse_reaction_adds_repeated_species():
+    assert parse_reaction("A + A -> B") == ({"A": 2}, {"B": 1})
+    assert parse_reaction("A + C -> 2C") == ({"A": 1, "C": 1}, {"C": 2})
+
+
+def test_repeated_reactants_set_the_order():
+    repeated = KineticsModel(["A + A -> B"])
+    assert repeated.reactant_order.tolist() == [[2.0]]
+    np.testing.assert_allclose(
+        repeated.rates([0.5, 0.0], [2.0]),
+        KineticsModel(["2A -> B"]).rates([0.5, 0.0], [2.0]),
+    )
+
+
+def test_autocatalysis():
+    # A + C -> 2C: rate k[A][C], A is used up and C gains one net.
+    model = KineticsModel(["A + C -> 2C"])
+    assert model.species == ["A", "C"]
+    assert model.stoichiometry.tolist() == [[-1.0], [1.0]]
+    np.testing.assert_allclose(model.rhs([0.5, 0.2], [3.0]), [[-0.3, 0.3]])
+
+
+@pytest.mark.parametrize("reactions", [["A + A -> B"], ["A + C -> 2C", "C -> D"]])
+def test_jacobian_matches_finite_differences(reactions):
+    model = KineticsModel(reactions)
+    rng = np.random.default_rng(0)
+    c = rng.uniform(0.1, 1.0, len(model.species))
+    k = rng.uniform(0.5, 2.0, len(model.reactions))
+    step = 1e-7
+    numeric = np.column_stack(
+        [
+            (model.rhs(c + step * e, k) - model.rhs(c - step * e, k))[0] / (2 * step)
+            for e in np.eye(len(c))
+        ]
+    )
+    np.testing.assert_allclose(model.jacobian(c, k)[0], numeric, rtol=1e-6)
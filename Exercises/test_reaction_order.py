@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from reaction_order import NO_ORDER, analyze_reaction, classify_reactions, pack
+
+T = np.linspace(0, 100, 20)
+
+
+def test_degenerate_experiments_get_no_order():
+    fit = classify_reactions(
+        *pack(
+            [
+                ([], []),
+                ([0.0], [1.0]),
+                (T, np.full_like(T, 0.5)),
+                (T, np.exp(-0.01 * T)),
+            ]
+        )
+    )
+    assert fit.order.tolist() == [NO_ORDER, NO_ORDER, NO_ORDER, 1]
+    assert np.isnan(fit.k[:3]).all()
+    assert fit.k[3] == pytest.approx(0.01)
+
+
+def test_ties_pick_the_lower_order():
+    # Two points fit every order exactly.
+    fit = classify_reactions(*pack([([0.0, 10.0], [1.0, 0.5])]))
+    np.testing.assert_allclose(fit.r_squared[0], 1.0)
+    assert fit.order.tolist() == [0]
+    assert fit.k[0] == pytest.approx(0.05)
+
+
+@pytest.mark.parametrize(
+    "order, concentration",
+    [
+        (0, 1 - 0.005 * T),
+        (1, np.exp(-0.005 * T)),
+        (2, 1 / (1 + 0.005 * T)),
+    ],
+)
+def test_known_orders(order, concentration):
+    fit = classify_reactions(*pack([(T, concentration)]))
+    assert fit.order.tolist() == [order]
+    assert fit.k[0] == pytest.approx(0.005)
+
+
+def test_analyze_reaction_returns_without_printing(capsys):
+    name, k, r_squared = analyze_reaction(T, np.exp(-0.005 * T))
+    assert (name, k) == ("First", pytest.approx(0.005))
+    assert r_squared == pytest.approx(1.0)
+    assert capsys.readouterr().out == ""
+
+
+def test_analyze_reaction_rejects_constant_data():
+    with pytest.raises(ValueError):
+        analyze_reaction(T, np.ones_like(T))
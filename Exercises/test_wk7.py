@@ -0,0 +1,33 @@
+import warnings
+
+import pytest
+
+import wk7
+
+
+def run_main(monkeypatch, answers):
+    answers = iter(answers)
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        wk7.main()
+
+
+def test_k_from_concentrations(monkeypatch, capsys):
+    run_main(monkeypatch, ["A + B -> 2C", "K", "0.5", "2", "3"])
+    assert "Equilibrium constant (K): 9.00" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("values", [["0", "2", "3"], ["0.5", "2", "0"]])
+def test_zero_concentration_is_reported(monkeypatch, values):
+    with pytest.raises(ZeroDivisionError, match="is zero"):
+        run_main(monkeypatch, ["A + B -> 2C", "K"] + values)
+
+
+def test_negative_concentration_is_reported(monkeypatch):
+    with pytest.raises(ValueError, match="B must be positive"):
+        run_main(monkeypatch, ["A + B -> 2C", "C", "0.5", "-2", "9"])
+
+
+def test_repeated_species_are_summed():
+    assert wk7.parse_reaction("A + A -> B") == ({"A": 2}, {"B": 1})
@@ -0,0 +1,276 @@
+"""
+Titration curves for a whole grid of titrant volumes at once.
+
+calculate_equilibrium_and_ph solves one point per call with chempy, so a
+2,000-point curve means 2,000 root calls. In a titration of acids and bases
+every point is one equation in one unknown, the charge balance
+
+    [H+] - Kw / [H+] + sum_i c_i * (z_i + s_i - n_i([H+])) = 0
+
+where c_i is the diluted total concentration of species i, z_i the charge
+of its fully protonated form, s_i the charge of its spectator ions (Na+ of
+NaOH, Cl- of HCl) and n_i the mean number of protons it has lost. The left
+side rises monotonically with [H+], so titration_curve solves every point
+together with a bracketed Newton iteration in ln[H+]. The bracket keeps
+each point converging across the jump at an equivalence point, which is
+where continuing from the previous point's pH is the worst guess.
+
+Example:
+    curve = titration_curve("CH3COOH", "NaOH", 0.1, 25.0, 0.1,
+                            np.linspace(0, 50, 2000))
+    curve.pH, curve.equivalence_volume
+"""
+
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+KW = 1.0e-14
+LOG_H_BOUNDS = (np.log(1e-16), np.log(1e2))
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-12
+
+Species = namedtuple("Species", "name pka charge spectator")
+Species.__doc__ = """
+An acid, base or salt in a titration.
+
+pka (tuple of float): pKa values of its fully protonated form, empty for
+strong acids and bases.
+charge (int): The charge of the fully protonated form (NH4+ -> 1).
+spectator (int): The total charge of the spectator ions per formula unit
+(HCl -> -1, NaOH -> 1, Na2CO3 -> 2).
+"""
+
+SPECIES = {
+    "HCl": Species("HCl", (), 0, -1),
+    "HNO3": Species("HNO3", (), 0, -1),
+    "NaOH": Species("NaOH", (), 0, 1),
+    "KOH": Species("KOH", (), 0, 1),
+    "CH3COOH": Species("CH3COOH", (4.76,), 0, 0),
+    "HCOOH": Species("HCOOH", (3.75,), 0, 0),
+    "HF": Species("HF", (3.17,), 0, 0),
+    "HCN": Species("HCN", (9.21,), 0, 0),
+    "NH3": Species("NH3", (9.25,), 1, 0),
+    "H2CO3": Species("H2CO3", (6.35, 10.33), 0, 0),
+    "Na2CO3": Species("Na2CO3", (6.35, 10.33), 0, 2),
+    "H2C2O4": Species("H2C2O4", (1.25, 4.27), 0, 0),
+    "H3PO4": Species("H3PO4", (2.15, 7.20, 12.35), 0, 0),
+}
+
+TitrationCurve = namedtuple(
+    "TitrationCurve",
+    "volume pH h_concentration analyte_concentration titrant_concentration "
+    "equivalence_volume equivalence_pH",
+)
+
+
+def get_species(species):
+    """
+    Returns a Species, looking names up in SPECIES.
+    """
+    if isinstance(species, Species):
+        return species
+    try:
+        return SPECIES[species]
+    except KeyError:
+        raise ValueError(
+            f"Unknown species {species!r}; pass a Species or one of {sorted(SPECIES)}"
+        )
+
+
+def dilute(analyte_concentration, analyte_volume, titrant_concentration, volumes):
+    """
+    Total concentrations of analyte and titrant after each addition.
+
+    Parameters:
+    analyte_concentration (float): The analyte's concentration in M.
+    analyte_volume (float): The analyte's starting volume.
+    titrant_concentration (float): The titrant's concentration in M.
+    volumes (array): Added titrant volumes, in the unit of analyte_volume.
+
+    Returns:
+    numpy.ndarray: The analyte concentration at each volume.
+    numpy.ndarray: The titrant concentration at each volume.
+    """
+    volumes = np.asarray(volumes, dtype=float)
+    total = analyte_volume + volumes
+    return (
+        analyte_concentration * analyte_volume / total,
+        titrant_concentration * volumes / total,
+    )
+
+
+def proton_loss(species, log_h):
+    """
+    Mean number of protons lost by a species and its derivative.
+
+    Parameters:
+    species (Species): The species.
+    log_h (numpy.ndarray): ln[H+] at each point.
+
+    Returns:
+    numpy.ndarray: The mean number of protons lost.
+    numpy.ndarray: Its derivative with respect to ln[H+], which is minus
+    the variance of the number of protons lost.
+    """
+    if not species.pka:
+        zero = np.zeros_like(log_h)
+        return zero, zero
+    # ln of the relative amount of the form that has lost j protons.
+    ln_ka = -np.log(10.0) * np.asarray(species.pka)
+    j = np.arange(len(ln_ka) + 1)
+    terms = np.concatenate(([0.0], np.cumsum(ln_ka)))[:, None] - j[:, None] * log_h
+    terms -= terms.max(axis=0)
+    fractions = np.exp(terms)
+    fractions /= fractions.sum(axis=0)
+    mean = j @ fractions
+    variance = (j**2) @ fractions - mean**2
+    return mean, -variance
+
+
+def solve_charge_balance(components, log_h=None):
+    """
+    Solves the charge balance for [H+] at every point at once.
+
+    Parameters:
+    components (list of tuple): (Species, total concentration array) pairs.
+    log_h (numpy.ndarray): Optional starting ln[H+] values.
+
+    Returns:
+    numpy.ndarray: [H+] at each point. A warning names the points that did
+    not converge within MAX_ITERATIONS.
+    """
+    shape = np.shape(components[0][1])
+    low = np.full(shape, LOG_H_BOUNDS[0])
+    high = np.full(shape, LOG_H_BOUNDS[1])
+    x = np.full(shape, np.log(1e-7)) if log_h is None else np.array(log_h, float)
+
+    for _ in range(MAX_ITERATIONS):
+        h = np.exp(x)
+        residual = h - KW / h
+        slope = h + KW / h
+        for species, concentration in components:
+            mean, derivative = proton_loss(species, x)
+            residual = residual + concentration * (
+                species.charge + species.spectator - mean
+            )
+            slope = slope - concentration * derivative
+        # The residual rises with ln[H+], so its sign narrows the bracket.
+        low = np.where(residual < 0, x, low)
+        high = np.where(residual > 0, x, high)
+        step = x - residual / slope
+        step = np.where((step > low) & (step < high), step, (low + high) / 2)
+        converged = np.abs(step - x) < TOLERANCE
+        x = step
+        if converged.all():
+            break
+    else:
+        failed = np.flatnonzero(~converged)
+        warnings.warn(
+            f"The charge balance did not converge in {MAX_ITERATIONS} "
+            f"iterations at {len(failed)} of {converged.size} points "
+            f"(first at index {failed[0]})."
+        )
+    return np.exp(x)
+
+
+def find_equivalence_points(volumes, pH, min_fraction=0.1):
+    """
+    Locates equivalence points as the peaks of |dpH/dV|.
+
+    Peaks smaller than min_fraction of the steepest one are ignored; each
+    peak is refined by fitting a parabola through it and its neighbours.
+
+    Returns:
+    numpy.ndarray: The equivalence volumes.
+    numpy.ndarray: The pH at each of them.
+    """
+    volumes = np.asarray(volumes, dtype=float)
+    pH = np.asarray(pH, dtype=float)
+    if len(volumes) < 3:
+        return np.empty(0), np.empty(0)
+    slope = np.abs(np.gradient(pH, volumes))
+    inner = slope[1:-1]
+    peaks = (
+        np.flatnonzero(
+            (inner > slope[:-2])
+            & (inner >= slope[2:])
+            & (inner >= min_fraction * slope.max())
+        )
+        + 1
+    )
+    left, middle, right = slope[peaks - 1], slope[peaks], slope[peaks + 1]
+    curvature = left - 2 * middle + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(curvature != 0, 0.5 * (left - right) / curvature, 0.0)
+    spacing = (volumes[peaks + 1] - volumes[peaks - 1]) / 2
+    equivalence_volume = volumes[peaks] + shift * spacing
+    return equivalence_volume, np.interp(equivalence_volume, volumes, pH)
+
+
+def titration_curve(
+    analyte,
+    titrant,
+    analyte_concentration,
+    analyte_volume,
+    titrant_concentration,
+    volumes,
+):
+    """
+    Calculates the pH curve of a titration and its equivalence points.
+
+    Parameters:
+    analyte (str or Species): The solution being titrated, e.g. "CH3COOH".
+    titrant (str or Species): The solution being added, e.g. "NaOH".
+    analyte_concentration (float): The analyte's concentration in M.
+    analyte_volume (float): The analyte's starting volume, e.g. in mL.
+    titrant_concentration (float): The titrant's concentration in M.
+    volumes (array): Added titrant volumes, in the unit of analyte_volume.
+
+    Returns:
+    TitrationCurve: The volumes, pH, [H+], the diluted analyte and titrant
+    concentrations at each volume, and the equivalence volumes and their pH.
+    """
+    analyte = get_species(analyte)
+    titrant = get_species(titrant)
+    volumes = np.asarray(volumes, dtype=float)
+    analyte_total, titrant_total = dilute(
+        analyte_concentration, analyte_volume, titrant_concentration, volumes
+    )
+    h = solve_charge_balance([(analyte, analyte_total), (titrant, titrant_total)])
+    pH = -np.log10(h)
+    equivalence_volume, equivalence_pH = find_equivalence_points(volumes, pH)
+    return TitrationCurve(
+        volumes,
+        pH,
+        h,
+        analyte_total,
+        titrant_total,
+        equivalence_volume,
+        equivalence_pH,
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    volumes = np.linspace(0, 50, 2000)
+    for analyte, titrant, c_titrant in [
+        ("CH3COOH", "NaOH", 0.1),
+        ("HCl", "NaOH", 0.1),
+        ("NH3", "HCl", 0.1),
+        ("H3PO4", "NaOH", 0.3),
+        ("Na2CO3", "HCl", 0.2),
+    ]:
+        start = time.perf_counter()
+        curve = titration_curve(analyte, titrant, 0.1, 25.0, c_titrant, volumes)
+        elapsed = time.perf_counter() - start
+        points = ", ".join(
+            f"{v:.2f} mL (pH {p:.2f})"
+            for v, p in zip(curve.equivalence_volume, curve.equivalence_pH)
+        )
+        print(
+            f"{analyte} with {titrant}: {len(volumes)} points in "
+            f"{elapsed * 1000:.1f} ms; equivalence at {points}"
+        )
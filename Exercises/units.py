@@ -0,0 +1,247 @@
+"""
+A compact units layer: one unit tag per array instead of one per value.
+
+calculate_substance_properties returns mass * q.gram / q.mol, a quantities
+object per formula, and the notebooks take .magnitude straight away. For
+batches, UnitArray keeps a plain NumPy array plus a single Unit. Units are
+combined and checked once per operation on the whole array, the values
+are only touched by ordinary NumPy arithmetic, and a quantities object is
+built only when to_quantities() is called.
+
+Example:
+    mm = UnitArray(molar_masses(formulas), g / mol)
+    b = UnitArray(mass_solute, g) / mm / UnitArray(mass_solvent, g).to(kg)
+    b.to(molal)             # checks the dimensions once for the array
+    b.to_quantities()       # one quantities array, on request
+"""
+
+import numpy as np
+
+# Base dimensions; a Unit scales values to these (kg, mol, m, s, K).
+DIMENSIONS = ("kg", "mol", "m", "s", "K")
+
+
+def _grouped(name):
+    return f"({name})" if "*" in name or "/" in name else name
+
+
+class Unit:
+    """
+    A unit as a scale factor to SI base units and a dimension exponent tuple.
+
+    Parameters:
+    name (str): The symbol, e.g. "g/mol"; also used by to_quantities.
+    scale (float): The size of the unit in base units (g -> 1e-3).
+    dimensions (tuple of int): Exponents of DIMENSIONS.
+    """
+
+    __slots__ = ("name", "scale", "dimensions")
+
+    def __init__(self, name, scale, dimensions):
+        self.name = name
+        self.scale = float(scale)
+        self.dimensions = tuple(dimensions)
+
+    def __repr__(self):
+        return f"Unit({self.name!r})"
+
+    def __str__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Unit)
+            and self.dimensions == other.dimensions
+            and np.isclose(self.scale, other.scale, rtol=1e-12, atol=0)
+        )
+
+    def __hash__(self):
+        return hash((self.dimensions, round(self.scale, 12)))
+
+    def __mul__(self, other):
+        if other is dimensionless:
+            return self
+        return Unit(
+            f"{self.name}*{other.name}",
+            self.scale * other.scale,
+            [a + b for a, b in zip(self.dimensions, other.dimensions)],
+        )
+
+    def __truediv__(self, other):
+        if other is dimensionless:
+            return self
+        return Unit(
+            f"{self.name}/{_grouped(other.name)}",
+            self.scale / other.scale,
+            [a - b for a, b in zip(self.dimensions, other.dimensions)],
+        )
+
+    def __pow__(self, power):
+        return Unit(
+            f"{_grouped(self.name)}**{power}",
+            self.scale**power,
+            [a * power for a in self.dimensions],
+        )
+
+    def is_compatible(self, other):
+        return self.dimensions == other.dimensions
+
+    def factor_to(self, other):
+        """
+        Returns the factor that converts values in this unit to other.
+        """
+        if not self.is_compatible(other):
+            raise ValueError(f"Cannot convert {self} to {other}")
+        return self.scale / other.scale
+
+
+dimensionless = Unit("dimensionless", 1, (0, 0, 0, 0, 0))
+kg = Unit("kg", 1, (1, 0, 0, 0, 0))
+g = Unit("g", 1e-3, (1, 0, 0, 0, 0))
+mol = Unit("mol", 1, (0, 1, 0, 0, 0))
+mmol = Unit("mmol", 1e-3, (0, 1, 0, 0, 0))
+m = Unit("m", 1, (0, 0, 1, 0, 0))
+L = Unit("L", 1e-3, (0, 0, 3, 0, 0))
+mL = Unit("mL", 1e-6, (0, 0, 3, 0, 0))
+s = Unit("s", 1, (0, 0, 0, 1, 0))
+K = Unit("K", 1, (0, 0, 0, 0, 1))
+
+g_per_mol = Unit("g/mol", 1e-3, (1, -1, 0, 0, 0))
+molal = Unit("mol/kg", 1, (-1, 1, 0, 0, 0))
+molar = Unit("mol/L", 1e3, (0, 1, -3, 0, 0))
+
+
+class UnitArray:
+    """
+    A NumPy array of values that all share one unit.
+
+    Parameters:
+    magnitude (array-like): The values.
+    unit (Unit): Their unit.
+    """
+
+    __slots__ = ("magnitude", "unit")
+    # Make NumPy defer to our reflected operators (array * UnitArray).
+    __array_ufunc__ = None
+
+    def __init__(self, magnitude, unit=dimensionless):
+        self.magnitude = np.asarray(magnitude, dtype=float)
+        self.unit = unit
+
+    def __repr__(self):
+        return f"UnitArray({self.magnitude!r}, {self.unit})"
+
+    def __len__(self):
+        return len(self.magnitude)
+
+    def __getitem__(self, index):
+        return UnitArray(self.magnitude[index], self.unit)
+
+    @property
+    def shape(self):
+        return self.magnitude.shape
+
+    def to(self, unit):
+        """
+        Returns the values converted to a compatible unit.
+        """
+        factor = self.unit.factor_to(unit)
+        if factor == 1:
+            return UnitArray(self.magnitude, unit)
+        return UnitArray(self.magnitude * factor, unit)
+
+    def check(self, unit):
+        """
+        Raises ValueError unless the array has the same dimensions as unit.
+        """
+        if not self.unit.is_compatible(unit):
+            raise ValueError(f"Expected units compatible with {unit}, got {self.unit}")
+        return self
+
+    def to_quantities(self):
+        """
+        Returns a quantities array, importing quantities only now.
+        """
+        import quantities as q
+
+        try:
+            return q.Quantity(self.magnitude, self.unit.name)
+        except Exception:
+            # Derived names such as "g*mol" may not parse; use base units.
+            base = q.dimensionless
+            for name, power in zip(DIMENSIONS, self.unit.dimensions):
+                if power:
+                    base = base * getattr(q, name) ** power
+            return q.Quantity(self.magnitude * self.unit.scale, base)
+
+    @classmethod
+    def from_quantities(cls, quantity, unit):
+        """
+        Wraps a quantities object, rescaled to unit, without keeping it.
+        """
+        return cls(quantity.rescale(unit.name).magnitude, unit)
+
+    def _other(self, other):
+        if isinstance(other, UnitArray):
+            return other.magnitude, other.unit
+        return other, dimensionless
+
+    def __mul__(self, other):
+        value, unit = self._other(other)
+        return UnitArray(self.magnitude * value, self.unit * unit)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        value, unit = self._other(other)
+        return UnitArray(self.magnitude / value, self.unit / unit)
+
+    def __rtruediv__(self, other):
+        value, unit = self._other(other)
+        return UnitArray(value / self.magnitude, unit / self.unit)
+
+    def __add__(self, other):
+        value, unit = self._other(other)
+        return UnitArray(self.magnitude + value * unit.factor_to(self.unit), self.unit)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        value, unit = self._other(other)
+        return UnitArray(self.magnitude - value * unit.factor_to(self.unit), self.unit)
+
+    def __neg__(self):
+        return UnitArray(-self.magnitude, self.unit)
+
+    def __pow__(self, power):
+        return UnitArray(self.magnitude**power, self.unit**power)
+
+    def sum(self):
+        return UnitArray(self.magnitude.sum(), self.unit)
+
+
+def molar_masses_with_units(formulas):
+    """
+    Molar masses of many formulas as one UnitArray in g/mol.
+    """
+    from molar_mass import molar_masses
+
+    return UnitArray(molar_masses(formulas), g_per_mol)
+
+
+def molality(mass_solute, molar_mass, mass_solvent):
+    """
+    Molality of whole arrays, with the units checked once.
+
+    Parameters:
+    mass_solute (UnitArray): Masses of solute.
+    molar_mass (UnitArray): Molar masses of the solutes.
+    mass_solvent (UnitArray): Masses of solvent.
+
+    Returns:
+    UnitArray: The molalities in mol/kg.
+    """
+    mass_solute.check(g)
+    molar_mass.check(g_per_mol)
+    mass_solvent.check(kg)
+    return (mass_solute / molar_mass / mass_solvent).to(molal)
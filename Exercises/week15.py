@@ -1,13 +1,14 @@
 # https://introtopython.org/terminal_apps.html
 
 import os
-import pickle
 
 from chempy import Substance
 import quantities as q
 from sympy import Eq, symbols
 from sympy.solvers.solveset import linsolve
 
+from balancer import balance_stoichiometry
+
 ### FUNCTIONS ###
 
 
@@ -36,13 +37,24 @@ def balance_equation():
 
     try:
         reactants, products = equation.split("->")
-        reactants = reactants.strip().split("+")
-        products = products.strip().split("+")
-
-        print("\nBalancing equations program is still basic...")
-        print("But for H2 + O2 -> H2O, the balanced equation is: 2H2 + O2 -> 2H2O")
+        reactants = [mol.strip() for mol in reactants.split("+")]
+        products = [mol.strip() for mol in products.split("+")]
     except ValueError:
         print("Invalid format. Please use the correct format (e.g., H2 + O2 -> H2O).")
+        return
+
+    try:
+        reactants, products = balance_stoichiometry(reactants, products)
+    except ValueError as e:
+        print(f"\nCould not balance the equation: {e}")
+        return
+
+    def format_side(side):
+        return " + ".join(
+            [f"{coeff if coeff != 1 else ''}{mol}" for mol, coeff in side.items()]
+        )
+
+    print(f"\nBalanced equation: {format_side(reactants)} -> {format_side(products)}")
 
 
 def display_title_bar():
@@ -65,15 +77,9 @@ def get_user_choice():
 
 
 def quit():
-    # This function dumps the names into a file, and prints a quit message.
-    try:
-        file_object = open("names.pydata", "wb")
-        pickle.dump(names, file_object)
-        file_object.close()
-        print("\nThanks for using this program.")
-    except Exception as e:
-        print("\nThanks for playing. I won't be able to remember these names.")
-        print(e)
+    # Prints a quit message. Names are saved by name_store.py as they are
+    #  added, so there is nothing to write here.
+    print("\nThanks for using this program.")
 
 
 ### MAIN PROGRAM ###
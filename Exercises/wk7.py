@@ -1,5 +1,8 @@
 import re
 
+from equilibrium_expression import EquilibriumExpression
+from ice_solver import solve_ice
+
 
 def parse_reaction(reaction):
     sides = reaction.split("->")
@@ -16,18 +19,40 @@ def parse_compounds(compound_string):
         if match:
             coeff = int(match.group(1)) if match.group(1) else 1
             name = match.group(2)
-            compound_dict[name] = coeff
+            # "A + A" is the same as "2A".
+            compound_dict[name] = compound_dict.get(name, 0) + coeff
     return compound_dict
 
 
 def get_equilibrium_expression(reactants, products):
-    reactants_part = " * ".join(
-        [f"[{name}]**{coeff}" for name, coeff in reactants.items()]
-    )
-    products_part = " * ".join(
-        [f"[{name}]**{coeff}" for name, coeff in products.items()]
-    )
-    return f"K = ({products_part}) / ({reactants_part})"
+    return str(EquilibriumExpression(reactants, products))
+
+
+def check_positive(known_values):
+    # K and the solved concentration are evaluated through logarithms, so a
+    # zero or negative value would come out as inf, 0 or NaN with numpy
+    # warnings; report it by name instead, as the old division did.
+    for name, value in known_values.items():
+        if value == 0:
+            raise ZeroDivisionError(f"{name} is zero; K cannot be evaluated")
+        if not value > 0:
+            raise ValueError(f"{name} must be positive, got {value}")
+
+
+def solve_ice_table(reactants, products):
+    # Asks for the initial concentrations and K, then solves the ICE table.
+    initial_concentrations = {}
+    for name in list(reactants.keys()) + list(products.keys()):
+        initial_concentrations[name] = float(
+            input(f"Enter the initial concentration of {name}: ")
+        )
+    K = float(input("Enter the value for K: "))
+
+    concentrations, extent = solve_ice(reactants, products, initial_concentrations, K)
+    print(f"\nExtent of reaction: {float(extent):.4g}")
+    print("Equilibrium concentrations:")
+    for name, concentration in concentrations.items():
+        print(f"[{name}] = {float(concentration):.4g}")
 
 
 def main():
@@ -45,9 +70,13 @@ def main():
     # Ask the user what they want to solve for
     variables = list(reactants.keys()) + list(products.keys()) + ["K"]
     print("\nAvailable variables to solve for:", ", ".join(variables))
+    print("Or enter ICE to solve from initial concentrations and K.")
     to_solve = input("Which variable would you like to solve for? ").strip()
 
-    if to_solve in variables:
+    if to_solve.upper() == "ICE":
+        solve_ice_table(reactants, products)
+
+    elif to_solve in variables:
         known_values = {}
         for variable in variables:
             if variable != to_solve:
@@ -57,48 +86,18 @@ def main():
                 known_values[variable] = value
 
         # Calculate the requested variable
+        check_positive(known_values)
+        expression = EquilibriumExpression(reactants, products)
         if to_solve == "K":
             # Calculate equilibrium constant K
-            numerator = 1
-            for name, coeff in products.items():
-                numerator *= known_values[name] ** coeff
-
-            denominator = 1
-            for name, coeff in reactants.items():
-                denominator *= known_values[name] ** coeff
-
-            K = numerator / denominator
+            K = float(expression.K(known_values))
             print(f"\nEquilibrium constant (K): {K:.2f}")
 
         else:
             # Solve for concentration of a specific compound
-            if to_solve in reactants:
-                coeff = reactants[to_solve]
-            else:
-                coeff = products[to_solve]
-
-            # Rearranging to solve for the desired concentration
-            if to_solve in products:
-                K = known_values["K"]
-                denominator = 1
-                for name, c in reactants.items():
-                    denominator *= known_values[name] ** c
-                numerator = K * denominator
-                for name, c in products.items():
-                    if name != to_solve:
-                        numerator /= known_values[name] ** c
-                concentration = numerator ** (1 / coeff)
-            elif to_solve in reactants:
-                K = known_values["K"]
-                numerator = 1
-                for name, c in products.items():
-                    numerator *= known_values[name] ** c
-                denominator = numerator / K
-                for name, c in reactants.items():
-                    if name != to_solve:
-                        denominator /= known_values[name] ** c
-                concentration = denominator ** (1 / coeff)
-
+            concentration = float(
+                expression.solve_for(to_solve, known_values["K"], known_values)
+            )
             print(f"\nConcentration of {to_solve}: {concentration:.2f}")
 
     else: